@@ -11,6 +11,9 @@ the YAML configuration; if not provided, it defaults to ``Dockerfiles/<name>``.
 
 Environment variables required by analyzers (e.g. tokens) are read
 before container launch.  If they are missing, an exception is raised.
+
+Analyzers run concurrently on a small thread pool; ``SAST_PARALLEL`` sets
+its size (default 4, ``1`` restores one-at-a-time execution).
 """
 
 from __future__ import annotations
@@ -19,12 +22,35 @@ import yaml  # type: ignore
 import os
 import logging
 import json
+import threading
+from collections import defaultdict
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, as_completed, wait
 from . import docker_utils
+from .docker_utils import env_flag
 from . import config_utils
 
 
 log = logging.getLogger(__name__)
 
+DEFAULT_PARALLEL = 4
+
+# One lock per image name so analyzers sharing an image build it only once
+_build_locks: defaultdict[str, threading.Lock] = defaultdict(threading.Lock)
+_build_locks_guard = threading.Lock()
+
+
+def analyzer_workers() -> int:
+    """Number of analyzers run at once, from ``SAST_PARALLEL``."""
+    raw = os.getenv("SAST_PARALLEL")
+    if not raw:
+        return DEFAULT_PARALLEL
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        log.warning("Ignoring invalid SAST_PARALLEL=%r", raw)
+        return DEFAULT_PARALLEL
+
+
 def build_image_if_needed(image_name: str, dockerfile_dir: str) -> None:
     """Ensure that a Docker image exists for the given analyzer.
 
@@ -32,8 +58,16 @@ def build_image_if_needed(image_name: str, dockerfile_dir: str) -> None:
     is skipped.  Otherwise, the image is built using the specified
     Dockerfile directory.  The ``LOG_LEVEL`` environment variable is
     passed as a build argument so that ``apt-get`` commands in the
-    Dockerfile can adjust their verbosity.
+    Dockerfile can adjust their verbosity.  Concurrent calls for the same
+    image wait for the first build instead of starting their own.
     """
+    with _build_locks_guard:
+        lock = _build_locks[image_name]
+    with lock:
+        _build_image_locked(image_name, dockerfile_dir)
+
+
+def _build_image_locked(image_name: str, dockerfile_dir: str) -> None:
     if docker_utils.image_exists(image_name):
         log.debug("Image '%s' already exists; skipping build", image_name)
         return
@@ -62,6 +96,7 @@ def run_docker(
     output_dir: str,
     pipeline_id: str,
     env_vars: list[str] | None = None,
+    container_name: str | None = None,
 ) -> None:
     """Run a single analyzer container.
 
@@ -72,6 +107,8 @@ def run_docker(
     :param project_path: Path of the project on the host (unused but kept for API compatibility).
     :param output_dir: Output directory on the host (unused but kept for API compatibility).
     :param env_vars: List of environment variable names to expose to the analyzer.
+    :param container_name: Optional container name; defaults to one derived
+                           from the image and pipeline ID.
     :raises Exception: If a required environment variable is not set.
     """
     log.info("Running analyzer image '%s'", image)
@@ -90,7 +127,8 @@ def run_docker(
             volumes_from=builder_container,
             env=env or None,
             args=args,
-            pipeline_id=pipeline_id
+            pipeline_id=pipeline_id,
+            name=container_name,
         )
     else:
         volumes = {
@@ -102,20 +140,33 @@ def run_docker(
             volumes=volumes,
             env=env or None,
             args=args,
-            pipeline_id=pipeline_id
+            pipeline_id=pipeline_id,
+            name=container_name,
         )
 
-def env_flag(name: str, default: bool = True) -> bool:
-    raw = os.getenv(name)
-    if raw is None:
-        return default
-    val = raw.strip().lower()
-    if val in {"1", "true", "yes", "y", "on"}:
-        return True
-    if val in {"0", "false", "no", "n", "off"}:
-        return False
+def build_all_images(analyzers: list[dict]) -> None:
+    """Build every distinct analyzer image up front, several at a time.
+
+    The first build failure is raised once the builds already running
+    have finished; builds not yet started are cancelled.
+    """
+    images: dict[str, str] = {}
+    for analyzer in analyzers:
+        name = analyzer.get("name")
+        images.setdefault(str(analyzer.get("image")),
+                          str(analyzer.get("dockerfile_path", f"/app/Dockerfiles/{name}")))
+    if not images:
+        return
+    with ThreadPoolExecutor(max_workers=min(8, len(images))) as executor:
+        futures = [executor.submit(build_image_if_needed, image, ctx) for image, ctx in images.items()]
+        _, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        for fut in pending:
+            fut.cancel()
+    for fut in futures:
+        exc = None if fut.cancelled() else fut.exception()
+        if exc is not None:
+            raise exc
 
-    return default
 
 def run_selected_analyzers(
     config_path: str,
@@ -161,23 +212,35 @@ def run_selected_analyzers(
     with open(os.path.join(output_dir, "launch_description.json"), "w", encoding="utf-8") as f:
         json.dump(launch_info, f, indent=4, ensure_ascii=False)
 
-    for analyzer in analyzers:
+    build_all_images(analyzers)
+
+    def _run_one(analyzer: dict) -> None:
         name = analyzer.get("name")
         image = analyzer.get("image")
-        dockerfile_dir = str(analyzer.get("dockerfile_path", f"/app/Dockerfiles/{name}"))
-        build_image_if_needed(str(image), dockerfile_dir)
         input_path = analyzer.get("input", project_path)
         output_file_name = config_helper.get_analyzer_result_file_name(analyzer)
 
         args = [str(input_path), str(output_dir), str(output_file_name)]
-        env_vars = analyzer.get("env", []) or []
+        env_vars = list(analyzer.get("env", []) or [])
         if log_level:
             env_vars += ["LOG_LEVEL"]
         try:
-            run_docker(str(image), builder_container, args, project_path, output_dir, pipeline_id, env_vars)
-        except KeyboardInterrupt:
-            raise
+            # Include the analyzer name: analyzers sharing an image run side by side
+            container_name = docker_utils.construct_container_name(f"{image}_{name}", pipeline_id)
+            run_docker(str(image), builder_container, args, project_path, output_dir, pipeline_id, env_vars,
+                       container_name)
         except Exception as exc:
             log.warning(f"Error occurred during launching of {name} : {exc}.")
 
+    # Submission follows the time_class order so fast analyzers start first
+    executor = ThreadPoolExecutor(max_workers=min(analyzer_workers(), len(analyzers)))
+    try:
+        futures = [executor.submit(_run_one, a) for a in analyzers]
+        for fut in as_completed(futures):
+            fut.result()
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+
     log.info("All selected analyzers completed.")
\ No newline at end of file
@@ -1,13 +1,32 @@
 import yaml
 import os
 import copy
+import functools
 import logging
 import textwrap
 from pathlib import Path
+from typing import Any, Dict
 from .docker_utils import get_pipeline_id
 
 log = logging.getLogger(__name__)
 
+# libyaml-backed loader when PyYAML was built with it; same semantics as safe_load
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def read_yaml_cached(config_path: str) -> Dict[str, Any]:
+    """Parse the YAML file at config_path, re-reading it only when its mtime changes.
+
+    The parsed data is shared between callers; copy it before mutating.
+    """
+    return _read_yaml(config_path, os.stat(config_path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_yaml(config_path: str, mtime_ns: int) -> Dict[str, Any]:
+    with open(config_path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=YAML_LOADER) or {}
+
 
 class AnalyzersConfigHelper:
     ANALYZER_ORDER = {
@@ -23,8 +42,7 @@ class AnalyzersConfigHelper:
             raise Exception(f"Config by path {config_path} not exist")
 
         self.config_path = config_path
-        with open(config_path, "r", encoding="utf-8") as f:
-            self.config = yaml.safe_load(f)
+        self.config = copy.deepcopy(read_yaml_cached(config_path))
 
         log.debug(f"Analyzer config: {self.config}")
 
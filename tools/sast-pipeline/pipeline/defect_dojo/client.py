@@ -2,16 +2,78 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import Any, Dict, Generator, List, Optional, Tuple
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Set, Tuple
 
 import requests
 from requests.adapters import HTTPAdapter
 import urllib3
 
+try:  # optional: streams large report uploads instead of buffering the multipart body
+    from requests_toolbelt.multipart.encoder import MultipartEncoder, MultipartEncoderMonitor  # type: ignore
+except ImportError:  # pragma: no cover - depends on environment
+    MultipartEncoder = MultipartEncoderMonitor = None
+
+try:  # optional: faster decoding of large listing pages
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
 logger = logging.getLogger(__name__)
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+STREAM_UPLOAD_MIN_BYTES = 8 * 1024 * 1024
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        logger.warning("Ignoring non-integer %s=%r", name, raw)
+        return default
+
+
+# Connections kept per DefectDojo host. Threads beyond this wait for a free connection (pool_block)
+# instead of opening sockets that get discarded; default enrichment worker counts are capped to it.
+HTTP_WORKERS = _env_int("DEFECTDOJO_HTTP_WORKERS", 100)
+PAGE_FETCH_WORKERS = 4
+RETRY_BACKOFF_MAX = 10.0  # seconds; upper bound for the exponential sleep between retries
+
+class _DojoRetry(urllib3.Retry):
+    """Retry idempotent calls on transient statuses; POST only when the server refused it unprocessed."""
+
+    POST_RETRY_STATUSES = frozenset([429, 503])
+    DEFAULT_BACKOFF_MAX = RETRY_BACKOFF_MAX
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method.upper() == "POST":
+            return bool(self.total) and status_code in self.POST_RETRY_STATUSES
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+# Built once at import and mounted on every client session; HTTPAdapter is thread-safe via its PoolManager.
+# POST stays out of allowed_methods so read errors/timeouts never re-send an import or metadata write.
+_RETRY_KWARGS: Dict[str, Any] = dict(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                                     allowed_methods=frozenset(["HEAD", "GET", "OPTIONS", "PATCH"]),
+                                     respect_retry_after_header=True,
+                                     # Out of retries: hand back the last response so raise_for_status reports its status
+                                     raise_on_status=False)
+try:
+    _SHARED_RETRY = _DojoRetry(backoff_max=RETRY_BACKOFF_MAX, **_RETRY_KWARGS)
+except TypeError:  # pragma: no cover - urllib3 < 2 reads DEFAULT_BACKOFF_MAX instead
+    _SHARED_RETRY = _DojoRetry(**_RETRY_KWARGS)
+_SHARED_ADAPTER = HTTPAdapter(pool_connections=100, pool_maxsize=HTTP_WORKERS, pool_block=True,
+                              max_retries=_SHARED_RETRY)
+# Upload bodies cannot be rewound by urllib3, so import-scan is mounted on an adapter without
+# retries and DefectDojoClient._post_upload re-sends the report itself with a fresh body.
+_STREAM_ADAPTER = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+UPLOAD_PATH = "/api/v2/import-scan/"
 
 
 @dataclass
@@ -19,7 +81,7 @@ class DojoConfig:
     url: str
     verify_ssl: bool = False
     minimum_severity: str = "Info"
-    name_mode: str = "analyzer-sha"  # analyzer | analyzer-branch | analyzer-sha
+    name_mode: str = "analyzer-sha"  # analyzer | analyzer-branch | analyzer-sha | analyzer-branch-sha
     engagement_status: str = "In Progress"
 
 
@@ -33,26 +95,97 @@ class ImportResult:
     raw: Dict[str, Any]
 
 
-# ------------ session helpers ------------
-def _clone_session(src: requests.Session) -> requests.Session:
-    s = requests.Session()
-    s.headers.update(src.headers or {})
-    s.verify = src.verify
-    try:
-        s.trust_env = src.trust_env  # type: ignore[attr-defined]
-    except Exception:
-        pass
-    if getattr(src, "proxies", None):
-        s.proxies.update(src.proxies)
-    if getattr(src, "auth", None):
-        s.auth = src.auth
-    # robust adapter
-    retry = urllib3.Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
-                          allowed_methods=frozenset(["HEAD", "GET", "OPTIONS"]), respect_retry_after_header=True)
-    adapter = HTTPAdapter(pool_connections=100, pool_maxsize=100, max_retries=retry)
-    s.mount("http://", adapter)
-    s.mount("https://", adapter)
-    return s
+def _json(r: requests.Response) -> Any:
+    """Decode a response body with orjson when installed, else requests' stdlib-based r.json()."""
+    if orjson is not None:
+        try:
+            return orjson.loads(r.content)
+        except orjson.JSONDecodeError:
+            pass  # let requests handle odd encodings / raise its own error type
+    return r.json()
+
+
+def _json_body(payload: Any) -> Dict[str, Any]:
+    """Request kwargs for a JSON body: pre-encoded by orjson when installed, else requests' json=."""
+    if orjson is not None:
+        return {"data": orjson.dumps(payload), "headers": {"Content-Type": "application/json"}}
+    return {"json": payload}
+
+
+# (url, token, verify_ssl) -> session; every client for the same server reuses its keep-alive connections
+_SESSIONS: Dict[Tuple[str, str, bool], requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+_insecure_warnings_disabled = False
+
+# (base url, engagement id) -> (fetched at, engagement); shared by clients so repeated enrichment
+# runs in one process skip engagement GETs. Entries older than the TTL are fetched again.
+ENGAGEMENT_CACHE_TTL = 300.0
+_ENGAGEMENT_CACHE: Dict[Tuple[str, int], Tuple[float, Dict[str, Any]]] = {}
+
+
+def _get_session(cfg: DojoConfig, token: str) -> requests.Session:
+    global _insecure_warnings_disabled
+    key = (cfg.url.rstrip("/"), token, bool(cfg.verify_ssl))
+    with _SESSIONS_LOCK:
+        if not cfg.verify_ssl and not _insecure_warnings_disabled:
+            # Unverified TLS is an explicit config choice; don't warn on every request
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            _insecure_warnings_disabled = True
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = _SESSIONS[key] = requests.Session()
+            session.headers.update({"Authorization": f"Token {token}", "Accept": "application/json"})
+            session.verify = cfg.verify_ssl
+            # Resolve proxy/CA environment once for this host instead of on every request
+            session.proxies.update(requests.utils.get_environ_proxies(key[0]))
+            if cfg.verify_ssl is True:
+                session.verify = os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE") or True
+            session.trust_env = False
+            session.mount("http://", _SHARED_ADAPTER)
+            session.mount("https://", _SHARED_ADAPTER)
+            # Longest prefix wins, so only report uploads use the non-retrying adapter
+            session.mount(key[0] + UPLOAD_PATH, _STREAM_ADAPTER)
+        return session
+
+
+def _retry_delay(r: requests.Response, attempt: int) -> float:
+    """Seconds to wait before re-sending after r: Retry-After if usable, else exponential backoff."""
+    delay = 0.3 * (2 ** attempt)
+    retry_after = r.headers.get("Retry-After")
+    if retry_after:
+        try:
+            delay = _SHARED_RETRY.parse_retry_after(retry_after)
+        except urllib3.exceptions.InvalidHeader:
+            logger.debug("Ignoring malformed Retry-After header %r", retry_after)
+    return min(delay, RETRY_BACKOFF_MAX)
+
+
+def _upload_progress(name: str, total: int) -> Callable[[Any], None]:
+    """MultipartEncoderMonitor callback logging roughly every 10% of an upload."""
+    step = max(1, total // 10)
+    next_at = [step]
+
+    def _cb(monitor: Any) -> None:
+        if monitor.bytes_read >= next_at[0]:
+            logger.debug("Uploading %s: %d/%d bytes", name, monitor.bytes_read, total)
+            next_at[0] = monitor.bytes_read + step
+
+    return _cb
+
+
+class _KeyLocks:
+    """Registry of per-key locks: concurrent misses on the same key are serialized, other keys proceed."""
+
+    def __init__(self) -> None:
+        self._locks: Dict[Any, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def get(self, key: Any) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
 
 
 class DefectDojoClient:
@@ -61,63 +194,104 @@ class DefectDojoClient:
     def __init__(self, cfg: DojoConfig, token: str) -> None:
         self.cfg = cfg
         self.base = cfg.url.rstrip("/")
-        self.session = requests.Session()
-        self.session.headers.update({"Authorization": f"Token {token}"})
-        self.session.verify = cfg.verify_ssl
-        # Attach robust adapters to the main session too
-        retry = urllib3.Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
-                              allowed_methods=frozenset(["HEAD", "GET", "OPTIONS"]), respect_retry_after_header=True,)
-        adapter = HTTPAdapter(pool_connections=100, pool_maxsize=100, max_retries=retry)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # One pooled session shared by all worker threads (requests are independent; urllib3 pools are thread-safe)
+        self.session = _get_session(cfg, token)
+        self._key_locks = _KeyLocks()
+        self._meta_post_tpl: Optional[requests.PreparedRequest] = None
+        # product name -> product, filled by get_or_create_product
+        self._products: Dict[str, Dict[str, Any]] = {}
+        # (product_id, engagement name) -> engagement, filled by ensure_engagement
+        self._engagements: Dict[Tuple[int, str], Dict[str, Any]] = {}
+
+    # ---------- Pagination ----------
+    def _get_page(self, url: str) -> Dict[str, Any]:
+        r = self.session.get(url)
+        r.raise_for_status()
+        return _json(r)
+
+    def _iter_pages(self, fetch: Callable[..., Dict[str, Any]], limit: int = 200,
+                    **params: Any) -> Generator[Dict[str, Any], None, None]:
+        """Yield list pages in id order using keyset paging (id__gt=<last id>), so deep pages stay cheap.
+
+        If the endpoint ignores id__gt (a page starts at or below the last seen id), the listing resumes
+        at the current offset and then follows the server's `next` links.
+        """
+        last_id: Optional[int] = None
+        next_url: Optional[str] = None
+        seen = 0
+        keyset = True
+        while True:
+            if next_url:
+                page = self._get_page(next_url)
+            else:
+                page_params = dict(params, o="id", limit=limit)
+                if not keyset:
+                    page_params["offset"] = seen
+                elif last_id is not None:
+                    page_params["id__gt"] = last_id
+                page = fetch(**page_params)
+            results = page.get("results", [])
+            if keyset and last_id is not None and results and int(results[0].get("id") or 0) <= last_id:
+                keyset = False
+                continue
+            yield page
+            if not results or not page.get("next"):
+                return
+            seen += len(results)
+            if keyset:
+                last_id = int(results[-1].get("id") or 0)
+            else:
+                next_url = page["next"]
 
     # ---------- Products ----------
     def list_products(self, **params: Any) -> Dict[str, Any]:
         r = self.session.get(f"{self.base}/api/v2/products/", params=params)
         r.raise_for_status()
-        return r.json()
+        return _json(r)
 
     def get_product_by_name(self, product_name: str) -> Optional[Dict[str, Any]]:
-        limit, offset = 200, 0
-        while True:
-            data = self.list_products(name=product_name, limit=limit, offset=offset)
+        for data in self._iter_pages(self.list_products, name=product_name):
             for p in data.get("results", []):
                 if p.get("name") == product_name:
                     return p
-            if not data.get("next"):
-                break
-            offset += limit
         return None
 
     def create_product(self, product_name: str) -> Dict[str, Any]:
         payload = {"name": product_name, "description": "Created automatically during report import", "prod_type": 1}
-        r = self.session.post(f"{self.base}/api/v2/products/", json=payload)
+        r = self.session.post(f"{self.base}/api/v2/products/", **_json_body(payload))
         r.raise_for_status()
-        return r.json()
+        return _json(r)
 
     def get_or_create_product(self, product_name: str) -> Dict[str, Any]:
-        return self.get_product_by_name(product_name) or self.create_product(product_name)
+        # Concurrent uploads for the same product must not both create it
+        with self._key_locks.get(("product", product_name)):
+            product = self._products.get(product_name)
+            if product is None:
+                product = self.get_product_by_name(product_name) or self.create_product(product_name)
+                self._products[product_name] = product
+            return product
 
     # ---------- Engagements ----------
     def get_engagements(self, **params: Any) -> Dict[str, Any]:
         r = self.session.get(f"{self.base}/api/v2/engagements/", params=params)
         r.raise_for_status()
-        return r.json()
+        return _json(r)
 
     def get_engagement(self, engagement_id: int) -> Dict[str, Any]:
         r = self.session.get(f"{self.base}/api/v2/engagements/{engagement_id}/")
         r.raise_for_status()
-        return r.json()
+        return _json(r)
 
     def patch_engagement(self, engagement_id: int, patch: Dict[str, Any]) -> Dict[str, Any]:
-        r = self.session.patch(f"{self.base}/api/v2/engagements/{engagement_id}/", json=patch)
+        _ENGAGEMENT_CACHE.pop((self.base, int(engagement_id)), None)
+        r = self.session.patch(f"{self.base}/api/v2/engagements/{engagement_id}/", **_json_body(patch))
         r.raise_for_status()
-        return r.json()
+        return _json(r)
 
     def create_engagement(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        r = self.session.post(f"{self.base}/api/v2/engagements/", json=payload)
+        r = self.session.post(f"{self.base}/api/v2/engagements/", **_json_body(payload))
         r.raise_for_status()
-        return r.json()
+        return _json(r)
 
     def ensure_engagement(self, product_id: int, name: str,
                           repo_url: Optional[str],
@@ -125,10 +299,25 @@ class DefectDojoClient:
                           commit_hash: Optional[str],
                           engagement_status: str = "In Progress",
                           engagement_type: str = "CI/CD") -> Dict[str, Any]:
-        data = self.get_engagements(product=product_id, name=name)
-        results = data.get("results", [])
-        if results:
-            eng = results[0]
+        key = (product_id, name)
+        with self._key_locks.get(("engagement",) + key):
+            eng = self._ensure_engagement(product_id, name, repo_url, branch_tag, commit_hash,
+                                          engagement_status, engagement_type)
+            self._engagements[key] = eng
+            return eng
+
+    def _ensure_engagement(self, product_id: int, name: str,
+                           repo_url: Optional[str],
+                           branch_tag: Optional[str],
+                           commit_hash: Optional[str],
+                           engagement_status: str,
+                           engagement_type: str) -> Dict[str, Any]:
+        # Analyzers of one run usually share the engagement name; skip the lookup once it is known
+        eng = self._engagements.get((product_id, name))
+        if eng is None:
+            results = self.get_engagements(product=product_id, name=name).get("results", [])
+            eng = results[0] if results else None
+        if eng is not None:
             patch: Dict[str, Any] = {}
             if repo_url and eng.get("source_code_management_uri") != repo_url:
                 patch["source_code_management_uri"] = repo_url
@@ -162,74 +351,245 @@ class DefectDojoClient:
     def list_findings(self, **params: Any) -> Dict[str, Any]:
         r = self.session.get(f"{self.base}/api/v2/findings/", params=params)
         r.raise_for_status()
-        return r.json()
+        return _json(r)
 
     def iter_findings(self, **params: Any) -> Generator[Dict[str, Any], None, None]:
-        limit, offset = params.pop("limit", 200), params.pop("offset", 0)
-        while True:
-            page = self.list_findings(limit=limit, offset=offset, **params)
-            for f in page.get("results", []):
-                yield f
-            if not page.get("next"):
-                break
-            offset += limit
-
-    def get_findings_for_test(self, test_id: int) -> List[Dict[str, Any]]:
-        return list(self.iter_findings(test=test_id, limit=200))
+        for page in self._iter_pages(self.list_findings, **params):
+            yield from page.get("results", [])
+
+    def get_findings_for_test(self, test_id: int, limit: int = 200) -> List[Dict[str, Any]]:
+        """All findings of one test. Pages after the first are fetched in parallel using the reported count."""
+        first = self.list_findings(test=test_id, o="id", limit=limit)
+        findings = list(first.get("results", []))
+        count = first.get("count")
+        if not first.get("next") or not findings:
+            return findings
+        if not isinstance(count, int):
+            return list(self.iter_findings(test=test_id, limit=limit))
+
+        # Step by what the server actually returned: it may cap limit below the requested value
+        step = len(findings)
+        offsets = range(step, count, step)
+        with ThreadPoolExecutor(max_workers=min(PAGE_FETCH_WORKERS, len(offsets))) as ex:
+            pages = ex.map(lambda off: self.list_findings(test=test_id, o="id", limit=limit, offset=off), offsets)
+            seen = {f.get("id") for f in findings}
+            for page in pages:
+                for f in page.get("results", []):
+                    if f.get("id") not in seen:
+                        seen.add(f.get("id"))
+                        findings.append(f)
+        return findings
 
     def get_finding(self, finding_id: int) -> Dict[str, Any]:
         r = self.session.get(f"{self.base}/api/v2/findings/{finding_id}/")
         r.raise_for_status()
-        return r.json()
+        return _json(r)
+
+    def get_findings_by_ids(self, finding_ids: Iterable[int], chunk_size: int = 100) -> List[Dict[str, Any]]:
+        """Findings for the given ids in input order, via the list endpoint's ``id`` filter.
+
+        Ids a chunk did not return (older servers, failed request) are fetched one by one.
+        """
+        ids = list(dict.fromkeys(int(x) for x in finding_ids))
+        by_id: Dict[int, Dict[str, Any]] = {}
+        for i in range(0, len(ids), chunk_size):
+            part = ids[i:i + chunk_size]
+            try:
+                data = self.list_findings(id=",".join(map(str, part)), limit=len(part))
+            except requests.RequestException as e:
+                logger.warning("Bulk findings lookup failed, fetching one by one: %s", e)
+                continue
+            wanted = set(part)
+            for f in data.get("results", []):
+                if f.get("id") in wanted:
+                    by_id[int(f["id"])] = f
+        missing = [fid for fid in ids if fid not in by_id]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(PAGE_FETCH_WORKERS, len(missing))) as ex:
+                for fid, f in zip(missing, ex.map(self.get_finding, missing)):
+                    by_id[fid] = f
+        return [by_id[fid] for fid in ids]
 
     def patch_finding(self, finding: Dict[str, Any]) -> Dict[str, Any]:
         fid = finding["id"]
         logger.debug(f"Attempt to patch {finding}")
-        r = _clone_session(self.session).patch(f"{self.base}/api/v2/findings/{fid}/", json=finding)
+        r = self.session.patch(f"{self.base}/api/v2/findings/{fid}/", **_json_body(finding))
         r.raise_for_status()
-        return r.json()
+        return _json(r)
 
     def delete_finding(self, finding_id: int) -> None:
         logger.warning(f"Deleting {finding_id}")
-        r = _clone_session(self.session).delete(f"{self.base}/api/v2/findings/{finding_id}/")
+        r = self.session.delete(f"{self.base}/api/v2/findings/{finding_id}/")
         if r.status_code in (200, 202, 204):
             return
         r.raise_for_status()
 
+    def delete_findings(self, finding_ids: Iterable[int],
+                        file_paths: Optional[Dict[int, str]] = None) -> int:
+        """Delete findings one after another on the calling thread. Returns the number deleted.
+
+        A failure is logged (with the finding's file_path when known) and does not stop the rest.
+        """
+        deleted = 0
+        for fid in finding_ids:
+            try:
+                self.delete_finding(fid)
+                deleted += 1
+            except Exception as e:
+                logger.warning("Failed to delete finding id=%s file_path=%s: %s",
+                               fid, (file_paths or {}).get(fid), e)
+        return deleted
+
     # ---------- Finding metadata ----------
     def has_sourcefile_link(self, finding_id: int) -> bool:
-        # Use cloned session to be thread-safe
-        s = _clone_session(self.session)
-        r = s.get(f"{self.base}/api/v2/findings/{finding_id}/metadata/", params={"name": "sourcefile_link"})
+        return self._has_finding_meta(finding_id, "sourcefile_link")
+
+    def _has_finding_meta(self, finding_id: int, name: str) -> bool:
+        r = self.session.get(f"{self.base}/api/v2/findings/{finding_id}/metadata/", params={"name": name})
         r.raise_for_status()
-        js = r.json()
+        js = _json(r)
         if isinstance(js, dict) and "results" in js:
-            return any(m.get("name") == "sourcefile_link" for m in js.get("results", []))
+            return any(m.get("name") == name for m in js.get("results", []))
         if isinstance(js, list):
-            return any(m.get("name") == "sourcefile_link" for m in js)
+            return any(m.get("name") == name for m in js)
         return False
 
+    def get_finding_ids_with_meta(self, finding_ids: Iterable[int], name: str) -> Set[int]:
+        """Return the subset of finding_ids that already carry metadata `name` (one listing instead of N GETs).
+
+        finding__in is not a documented /metadata/ filter. If the server answers with rows for
+        other findings, or with more pages than the ids can fill, it was ignored and each id is
+        checked on its own instead.
+        """
+        wanted = {int(fid) for fid in finding_ids}
+        found: Set[int] = set()
+        if not wanted:
+            return found
+        limit, offset = 200, 0
+        # At most one row per finding when the filter is honoured (plus slack for duplicates)
+        max_pages = len(wanted) // limit + 2
+        id_list = ",".join(str(fid) for fid in sorted(wanted))
+        for _ in range(max_pages):
+            r = self.session.get(f"{self.base}/api/v2/metadata/",
+                                 params={"name": name, "finding__in": id_list, "limit": limit, "offset": offset})
+            r.raise_for_status()
+            page = _json(r)
+            results = page.get("results", [])
+            if any(m.get("finding") not in wanted for m in results):
+                break
+            found.update(m["finding"] for m in results if m.get("name") == name)
+            if not page.get("next"):
+                return found
+            offset += limit
+        logger.debug("/metadata/ ignored finding__in; checking %d findings one by one", len(wanted))
+        return {fid for fid in sorted(wanted) if self._has_finding_meta(fid, name)}
+
+    def _meta_post_template(self) -> requests.PreparedRequest:
+        # Session headers/auth merged once; per-finding posts only fill in URL and body
+        if self._meta_post_tpl is None:
+            self._meta_post_tpl = self.session.prepare_request(
+                requests.Request("POST", f"{self.base}/api/v2/findings/", json={}))
+        return self._meta_post_tpl
+
+    def _send_finding_meta(self, finding_id: int, name: str, value: str) -> requests.Response:
+        req = self._meta_post_template().copy()
+        req.prepare_url(f"{self.base}/api/v2/findings/{finding_id}/metadata/", None)
+        payload = {"name": name, "value": value}
+        if orjson is not None:
+            # Content-Type: application/json is already on the template
+            req.prepare_body(data=orjson.dumps(payload), files=None)
+        else:
+            req.prepare_body(data=None, files=None, json=payload)
+        return self.session.send(req)
+
     def post_finding_meta_json(self, finding_id: int, name: str, value: str) -> None:
-        s = _clone_session(self.session)
-        url = f"{self.base.rstrip('/')}/api/v2/findings/{finding_id}/metadata/"
-        data = {"name": name, "value": value}
-        r = s.post(url, json=data)
+        r = self._send_finding_meta(finding_id, name, value)
+        r.raise_for_status()
+
+    @staticmethod
+    def _is_duplicate_meta(r: requests.Response) -> bool:
+        # DefectDojo rejects a second metadata entry with the same name on a finding
+        if r.status_code not in (400, 409):
+            return False
+        body = r.text.lower()
+        return "already exists" in body or "unique" in body
+
+    def post_finding_meta_if_absent(self, finding_id: int, name: str, value: str) -> bool:
+        """POST metadata `name`; False if the finding already has it (DefectDojo rejects the duplicate name)."""
+        r = self._send_finding_meta(finding_id, name, value)
+        if self._is_duplicate_meta(r):
+            return False
+        r.raise_for_status()
+        return True
+
+    def upsert_finding_meta(self, finding_id: int, name: str, value: str) -> None:
+        """POST metadata `name`; only if it already exists, look it up and PATCH the value."""
+        r = self._send_finding_meta(finding_id, name, value)
+        if not self._is_duplicate_meta(r):
+            r.raise_for_status()
+            return
+        r = self.session.get(f"{self.base}/api/v2/metadata/", params={"finding": finding_id, "name": name})
+        r.raise_for_status()
+        existing = [m for m in _json(r).get("results", []) if m.get("name") == name]
+        if not existing:
+            raise requests.HTTPError(f"Metadata '{name}' reported as existing but not found for finding {finding_id}")
+        r = self.session.patch(f"{self.base}/api/v2/metadata/{existing[0]['id']}/", **_json_body({"value": value}))
         r.raise_for_status()
 
     # ---------- Engagement fetch (for enrichment) ----------
     def fetch_engagement(self, eng_id: int, cache: dict, cache_lock) -> dict:
-        with cache_lock:
-            if eng_id in cache:
-                return cache[eng_id]
-        s = _clone_session(self.session)
-        r = s.get(f"{self.base}/api/v2/engagements/{eng_id}/")
-        r.raise_for_status()
-        data = r.json()
-        with cache_lock:
-            cache[eng_id] = data
+        # Hits are lock-free: a single dict lookup is atomic and entries are only ever added, never replaced
+        data = cache.get(eng_id)
+        if data is not None:
+            return data
+        # Only one worker fetches a given engagement; the others wait and reuse its result
+        with self._key_locks.get(("engagement", eng_id)):
+            with cache_lock:
+                if eng_id in cache:
+                    return cache[eng_id]
+            key = (self.base, int(eng_id))
+            entry = _ENGAGEMENT_CACHE.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ENGAGEMENT_CACHE_TTL:
+                data = entry[1]
+            else:
+                r = self.session.get(f"{self.base}/api/v2/engagements/{eng_id}/")
+                r.raise_for_status()
+                data = _json(r)
+                _ENGAGEMENT_CACHE[key] = (time.monotonic(), data)
+            with cache_lock:
+                cache[eng_id] = data
         return data
 
     # ---------- Importers ----------
+    def _post_upload(self, url: str, fields: Dict[str, str], file_field: Tuple[str, Any, str]) -> requests.Response:
+        """POST a report, re-sending it on the statuses _DojoRetry allows for POST.
+
+        Large files are streamed with a MultipartEncoder when requests_toolbelt is installed.
+        urllib3 cannot rewind a body it already consumed, so each attempt seeks the file back
+        to the start and builds a fresh one.
+        """
+        name, fh, content_type = file_field
+        streamed = MultipartEncoder is not None and os.fstat(fh.fileno()).st_size >= STREAM_UPLOAD_MIN_BYTES
+        attempts = (_SHARED_RETRY.total or 0) + 1
+        for attempt in range(attempts):
+            fh.seek(0)
+            if streamed:
+                # Read the file in chunks while sending instead of building the body in memory
+                body = MultipartEncoder(fields={**fields, "file": (name, fh, content_type)})
+                if logger.isEnabledFor(logging.DEBUG):
+                    body = MultipartEncoderMonitor(body, _upload_progress(name, body.len))
+                req = requests.Request("POST", url, data=body, headers={"Content-Type": body.content_type})
+            else:
+                req = requests.Request("POST", url, data=fields, files={"file": file_field})
+            r = self.session.send(self.session.prepare_request(req))
+            if r.status_code not in _DojoRetry.POST_RETRY_STATUSES or attempt == attempts - 1:
+                return r
+            delay = _retry_delay(r, attempt)
+            logger.warning("Upload of %s got HTTP %s; retrying in %.1fs", name, r.status_code, delay)
+            r.close()
+            time.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
     def import_scan(self, engagement_id: int, scan_type: str, report_path: str,
                     minimum_severity: str, build_id: Optional[str] = None) -> Dict[str, Any]:
         data = {
@@ -242,8 +602,8 @@ class DefectDojoClient:
         }
         if build_id:
             data["build_id"] = build_id
+        url = self.base + UPLOAD_PATH
         with open(report_path, "rb") as fh:
-            files = {"file": (os.path.basename(report_path), fh, "application/octet-stream")}
-            r = self.session.post(f"{self.base}/api/v2/import-scan/", data=data, files=files)
+            r = self._post_upload(url, data, (os.path.basename(report_path), fh, "application/octet-stream"))
             r.raise_for_status()
-            return r.json()
+            return _json(r)
@@ -0,0 +1,73 @@
+"""
+Opt-in on-disk record of findings that already carry a sourcefile_link.
+
+Bulk enrichment re-checks every finding of a product on each run. With
+SAST_ENRICH_CACHE set, finding ids known to be linked are stored per
+DefectDojo URL in SQLite, so repeat runs only look at new findings.
+
+  SAST_ENRICH_CACHE=1            -> ~/.cache/sast-combinator/enriched.sqlite
+  SAST_ENRICH_CACHE=/some/file   -> that file
+
+The cache trusts its records: links removed in DefectDojo are not re-added
+while the finding id stays cached. Delete the file to force a full pass.
+A connection is used only from the thread that opened it.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path.home() / ".cache" / "sast-combinator" / "enriched.sqlite"
+
+
+class EnrichCache:
+    def __init__(self, path: str | Path, base: str) -> None:
+        self.path = Path(path)
+        self.base = base
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS enriched(base TEXT, fid INTEGER, link TEXT, PRIMARY KEY(base, fid))")
+
+    def known(self, finding_ids: Iterable[int]) -> Set[int]:
+        """Subset of finding_ids recorded as already linked."""
+        ids = list(finding_ids)
+        found: Set[int] = set()
+        # Stay below SQLite's default host-parameter limit
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT fid FROM enriched WHERE base=? AND fid IN ({','.join('?' * len(chunk))})",
+                (self.base, *chunk))
+            found.update(row[0] for row in rows)
+        return found
+
+    def add(self, items: Iterable[Tuple[int, Optional[str]]]) -> None:
+        """Record (finding_id, link) pairs; link may be None when only presence is known."""
+        rows = [(self.base, int(fid), link) for fid, link in items]
+        if not rows:
+            return
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO enriched(base, fid, link) VALUES (?, ?, ?)", rows)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_enrich_cache(base: str) -> Optional[EnrichCache]:
+    """EnrichCache for base if SAST_ENRICH_CACHE is set, else None."""
+    raw = (os.environ.get("SAST_ENRICH_CACHE") or "").strip()
+    if not raw or raw.lower() in {"0", "false", "no", "off"}:
+        return None
+    path = DEFAULT_PATH if raw.lower() in {"1", "true", "yes", "on"} else Path(raw).expanduser()
+    try:
+        return EnrichCache(path, base)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Enrichment cache disabled, cannot open %s: %s", path, e)
+        return None
@@ -17,13 +17,14 @@ Usage examples:
 
 from __future__ import annotations
 import argparse
+import functools
 import os
 import re
 import logging
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -43,22 +44,44 @@ def run_git(repo: Path, args: list[str]) -> str:
     return out.strip()
 
 
+# (host substring, scm type); first match wins, so more specific needles come first
+_SCM_RULES: Tuple[Tuple[str, str], ...] = (
+    ("github", "github"),
+    ("gitlab", "gitlab"),
+    ("bitbucket.org", "bitbucket-cloud"),
+    ("bitbucket", "bitbucket-server"),
+    ("gitea", "gitea"),
+    ("codeberg", "codeberg"),
+    ("dev.azure.com", "azure"),
+    ("visualstudio.com", "azure"),
+)
+
+# Exact DNS label -> scm type; most hosts resolve here without a substring scan
+_SCM_LABELS: Dict[str, str] = {
+    "github": "github",
+    "gitlab": "gitlab",
+    "bitbucket": "bitbucket-server",
+    "gitea": "gitea",
+    "codeberg": "codeberg",
+    "visualstudio": "azure",
+}
+
+
+@functools.lru_cache(maxsize=256)
 def detect_scm_type(host: str) -> str:
     h = host.lower()
-    if "github" in h:
-        return "github"
-    if "gitlab" in h:
-        return "gitlab"
-    if "bitbucket.org" in h:
+    if h.endswith("bitbucket.org"):
         return "bitbucket-cloud"
-    if "bitbucket" in h:
-        return "bitbucket-server"
-    if "codeberg" in h:
-        return "codeberg"
-    if "gitea" in h:
-        return "gitea"
-    if "dev.azure.com" in h or "visualstudio.com" in h:
+    if h.endswith("dev.azure.com"):
         return "azure"
+    for label in h.split("."):
+        scm = _SCM_LABELS.get(label)
+        if scm:
+            return scm
+    # Hosts like git.mygitlab.corp only match by substring
+    for needle, scm in _SCM_RULES:
+        if needle in h:
+            return scm
     return "generic"
 
 
@@ -130,8 +153,8 @@ def read_repo_params(repo_dir: str | Path) -> RepoParams:
         pass
 
     origin = run_git(repo, ["remote", "get-url", "origin"])
-    branch = run_git(repo, ["rev-parse", "--abbrev-ref", "HEAD"])
-    commit = run_git(repo, ["rev-parse", "HEAD"])
+    # One rev-parse for both: full HEAD sha, then (after --abbrev-ref) the branch name
+    commit, branch = run_git(repo, ["rev-parse", "HEAD", "--abbrev-ref", "HEAD"]).splitlines()
     web_url, scm = normalize_origin_to_web_url(origin)
 
     logger.info(f"Found git info. branch {branch}. commit {commit}. web url {web_url}. scm {scm}")
@@ -1,68 +1,123 @@
 from __future__ import annotations
 
+import functools
+import itertools
 import logging
 import os
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from .client import DefectDojoClient, DojoConfig, ImportResult
+from .client import HTTP_WORKERS, DefectDojoClient, DojoConfig, ImportResult
+from .enrich_cache import open_enrich_cache
+from .repo_info import detect_scm_type
 
 logger = logging.getLogger(__name__)
 
+ENRICH_CHUNK_SIZE = 16
+_EMPTY: Dict[str, Any] = {}  # shared read-only default for nested lookups; never mutate
+
+
+def _is_auth_error(exc: BaseException) -> bool:
+    """True for 401/403 from DefectDojo: every further request with this token fails too."""
+    resp = getattr(exc, "response", None)
+    return isinstance(exc, requests.HTTPError) and resp is not None and resp.status_code in (401, 403)
+
+
+def _join_parts(*parts: Optional[str]) -> str:
+    return "-".join([x for x in parts if x])
+
+
+# name_mode -> engagement name from (analyzer, branch, short sha); unknown modes use analyzer-sha
+_ENGAGEMENT_NAMERS: Dict[str, Callable[[str, Optional[str], str], str]] = {
+    "analyzer": lambda a, b, c: a,
+    "analyzer-branch": lambda a, b, c: _join_parts(a, b),
+    "analyzer-branch-sha": lambda a, b, c: _join_parts(a, b, c),
+    "analyzer-sha": lambda a, b, c: _join_parts(a, c),
+}
+ENGAGEMENT_NAME_MODES = frozenset(_ENGAGEMENT_NAMERS)
+
+
+def _chunked(items: List[Any], workers: int) -> List[List[Any]]:
+    """Split items into at most ENRICH_CHUNK_SIZE-sized chunks, small enough to keep every worker busy."""
+    size = max(1, min(ENRICH_CHUNK_SIZE, -(-len(items) // max(1, workers))))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def enrich_workers() -> int:
+    """Thread count for finding enrichment; never more than the HTTP pool can serve.
+
+    Enrichment is network-bound (one or two requests per finding), so the pool
+    is sized well above the CPU count, like ThreadPoolExecutor's own default.
+    """
+    return min(HTTP_WORKERS, 32, 4 * (os.cpu_count() or 4))
+
+
+# scm type -> (prefix, suffix) format strings placed around the file path
+_LINK_TEMPLATES: Dict[str, Tuple[str, str]] = {
+    "github": ("{base}/blob/{ref}/", ""),
+    "gitlab": ("{base}/-/blob/{ref}/", ""),
+    "bitbucket-cloud": ("{base}/src/{ref}/", ""),
+    "bitbucket-server": ("{base}/browse/", "?at={ref}"),
+    "gitea": ("{base}/src/{ref}/", ""),
+    "codeberg": ("{base}/src/{ref}/", ""),
+    "azure": ("{base}/?path=/", "&version=GC{ref}"),
+}
+_GENERIC_TEMPLATE = _LINK_TEMPLATES["github"]
+
+
+@functools.lru_cache(maxsize=256)
+def _scm_type(repo_url: str) -> str:
+    # repo_url is constant for a whole report, so parse and classify it once
+    return detect_scm_type(urlparse(repo_url).netloc)
+
+
+@functools.lru_cache(maxsize=1024)
+def _link_template(repo_url: str, ref: Optional[str]) -> Callable[[str], Optional[str]]:
+    # Everything except the file path is fixed for a (repo, ref) pair, so resolve it once
+    if not repo_url:
+        return lambda file_path: None
+    prefix_fmt, suffix_fmt = _LINK_TEMPLATES.get(_scm_type(repo_url), _GENERIC_TEMPLATE)
+    fields = {"base": repo_url.rstrip("/"), "ref": ref or "master"}
+    prefix, suffix = prefix_fmt.format(**fields), suffix_fmt.format(**fields)
+
+    def _link(file_path: str) -> Optional[str]:
+        if not file_path:
+            return None
+        return prefix + file_path.replace("file://", "").lstrip("/") + suffix
+
+    return _link
+
+
+@functools.lru_cache(maxsize=None)
+def _probe_session() -> requests.Session:
+    # Link probes hit the same few SCM hosts; one pooled keep-alive session avoids a TLS handshake per finding
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=100)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 class LinkBuilder:
     """Build source links for GitHub/GitLab/Bitbucket; verify remote file existence (handles 429)."""
 
     """Builds repository links without line anchors, based on repo host and ref."""
-    @staticmethod
-    def _scm_type(repo_url: str) -> str:
-        from urllib.parse import urlparse
-        host = urlparse(repo_url).netloc.lower()
-        if "github" in host:
-            return "github"
-        if "gitlab" in host:
-            return "gitlab"
-        if "bitbucket.org" in host:
-            return "bitbucket-cloud"
-        if "bitbucket" in host:
-            return "bitbucket-server"
-        if "gitea" in host:
-            return "gitea"
-        if "codeberg" in host:
-            return "codeberg"
-        if "dev.azure.com" in host or "visualstudio.com" in host:
-            return "azure"
-        return "generic"
+    _scm_type = staticmethod(_scm_type)
+    template_for = staticmethod(_link_template)
 
     def build(self, repo_url: str, file_path: str, ref: Optional[str]) -> Optional[str]:
-        if not repo_url or not file_path:
-            return None
-        scm = self._scm_type(repo_url)
-        ref = ref or "master"
-        file_path = file_path.replace("file://","")
-        fp = file_path.lstrip("/")
-        if scm == "github":
-            return f"{repo_url.rstrip('/')}/blob/{ref}/{fp}"
-        if scm == "gitlab":
-            return f"{repo_url.rstrip('/')}/-/blob/{ref}/{fp}"
-        if scm == "bitbucket-cloud":
-            return f"{repo_url.rstrip('/')}/src/{ref}/{fp}"
-        if scm == "bitbucket-server":
-            return f"{repo_url.rstrip('/')}/browse/{fp}?at={ref}"
-        if scm in ("gitea", "codeberg"):
-            return f"{repo_url.rstrip('/')}/src/{ref}/{fp}"
-        if scm == "azure":
-            return f"{repo_url.rstrip('/')}/?path=/{fp}&version=GC{ref}"
-        return f"{repo_url.rstrip('/')}/blob/{ref}/{fp}"
+        return self.template_for(repo_url, ref)(file_path)
 
     @staticmethod
     def remote_link_exists(url: str, timeout: int = 5, max_retries: int = 3) -> Optional[bool]:
         """Return True if GET 200/3xx, False if 404, None for other errors. Retries on 429."""
         try:
-            r = requests.get(url, allow_redirects=True, timeout=timeout)
+            r = _probe_session().get(url, allow_redirects=True, timeout=timeout)
             logger.debug(f"Checking url {url}. Status code {r.status_code}")
             if r.status_code == 429 and max_retries > 0:
                 retry = int(r.headers.get("Retry-After", "1"))
@@ -88,12 +143,8 @@ class SastPipelineDDClient(DefectDojoClient):
 
     @staticmethod
     def derive_engagement_name(analyzer_name: str, branch: Optional[str], commit: Optional[str], name_mode: str) -> str:
-        short = (commit or "")[:8] if commit else None
-        if name_mode == "analyzer":
-            return analyzer_name
-        if name_mode == "analyzer-branch":
-            return "-".join([x for x in [analyzer_name, branch] if x])
-        return "-".join([x for x in [analyzer_name, short] if x]) or analyzer_name
+        namer = _ENGAGEMENT_NAMERS.get(name_mode, _ENGAGEMENT_NAMERS["analyzer-sha"])
+        return namer(analyzer_name, branch, (commit or "")[:8]) or analyzer_name
 
     # Upload single report: import -> collect findings -> trim -> enrich
     def upload_report(self,
@@ -102,7 +153,13 @@ class SastPipelineDDClient(DefectDojoClient):
                       scan_type: str,
                       report_path: str,
                       repo_params,
-                      trim_path: str) -> ImportResult:
+                      trim_path: str,
+                      executor: Optional[Executor] = None) -> ImportResult:
+        """Import one report and enrich its findings.
+
+        Enrichment runs on ``executor`` when given (the caller owns and shuts
+        it down), otherwise on a pool created for this call.
+        """
         if not os.path.isfile(report_path):
             raise FileNotFoundError(f"Report path does not exist: {report_path}")
 
@@ -138,14 +195,14 @@ class SastPipelineDDClient(DefectDojoClient):
                 findings = self.get_findings_for_test(int(test_id))
             elif "findings" in import_resp and isinstance(import_resp["findings"], list):
                 ids = [fi.get("id") if isinstance(fi, dict) else fi for fi in import_resp["findings"]]
-                for fid in ids:
-                    findings.append(self.get_finding(int(fid)))
+                findings = self.get_findings_by_ids(ids)
 
         imported_count = len(findings)
 
         # Enrich metadata (trim + link)
         linker = LinkBuilder()
         ref = repo_params.commit_hash or repo_params.branch_tag
+        link_for = linker.template_for(repo_params.repo_url or "", ref)
         logger.info(f"Start enriching {len(findings)} findings")
 
         def _validate_and_update_finding(finding: Dict[str, Any]) -> Dict[str, Any]:
@@ -164,7 +221,7 @@ class SastPipelineDDClient(DefectDojoClient):
                 # trim patch if needed
                 f = _validate_and_update_finding(f)
                 file_path = f.get("file_path", "")
-                link = linker.build(repo_params.repo_url or "", file_path, ref)
+                link = link_for(file_path)
                 if not link:
                     return 0
 
@@ -182,17 +239,38 @@ class SastPipelineDDClient(DefectDojoClient):
                     logger.warning("Skip enrichment for %s due to ambiguous link check: %s", f.get("id"), link)
                     return 0
             except Exception as e:
+                if _is_auth_error(e):
+                    if not auth_failed.is_set():
+                        auth_failed.set()
+                        logger.error("DefectDojo rejected the token (%s); stopping enrichment", e)
+                    return 0
                 logger.warning("Failed to enrich finding %s: %s", f.get("id"), e)
                 return 0
 
-        enriched = 0
-        workers = max(1, (os.cpu_count() or 4))
-        with ThreadPoolExecutor(max_workers=workers) as ex:
-            futures = [ex.submit(_process_one, f) for f in findings]
-            for fut in as_completed(futures):
-                enriched += fut.result()
-                if enriched and enriched % 100 == 0:
-                    logger.info("Enriched %d findings on this page", enriched)
+        progress = itertools.count(1)
+        auth_failed = threading.Event()
+
+        def _process_chunk(chunk: List[Dict[str, Any]]) -> int:
+            done = 0
+            for f in chunk:
+                if auth_failed.is_set():
+                    break
+                if _process_one(f):
+                    done += 1
+                    n = next(progress)
+                    if n % 100 == 0:
+                        logger.info("Enriched %d findings on this page", n)
+            return done
+
+        workers = enrich_workers()
+        if not findings or (not repo_params.repo_url and not trim_path):
+            # Nothing to trim and no repository to link to: no per-finding work at all
+            enriched = 0
+        elif executor is not None:
+            enriched = sum(executor.map(_process_chunk, _chunked(findings, workers)))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                enriched = sum(ex.map(_process_chunk, _chunked(findings, workers)))
 
         logger.info("Enriched findings: %s/%s", enriched, imported_count)
         return ImportResult(
@@ -213,32 +291,74 @@ class SastPipelineDDClient(DefectDojoClient):
 
         linker = LinkBuilder()
         updated_total = 0
-        offset = 0
 
         eng_cache = {}
         eng_cache_lock = threading.Lock()
+        auth_failed = threading.Event()  # set on 401/403; remaining findings are skipped
         if max_workers is None:
-            max_workers = max(1, (os.cpu_count() or 4))
-
-        def _process_one_finding(f: dict) -> int:
+            max_workers = enrich_workers()
+
+        def _has_inline_link(f: dict) -> Optional[bool]:
+            # DefectDojo serializes finding_meta with each finding; None if the server did not include it
+            meta = f.get("finding_meta")
+            if not isinstance(meta, list):
+                return None
+            return any(m.get("name") == "sourcefile_link" for m in meta if isinstance(m, dict))
+
+        def _linked_ids(findings: List[dict]) -> Optional[Set[int]]:
+            """IDs on this page that already have a sourcefile_link (inline meta first, one batch GET for the rest).
+
+            Returns None if the batch lookup failed; callers then fall back to conditional POSTs.
+            """
+            linked: Set[int] = set()
+            unknown: List[int] = []
+            for f in findings:
+                inline = _has_inline_link(f)
+                if inline is None:
+                    unknown.append(int(f["id"]))
+                elif inline:
+                    linked.add(int(f["id"]))
+            if unknown:
+                try:
+                    linked |= self.get_finding_ids_with_meta(unknown, "sourcefile_link")
+                except requests.RequestException as e:
+                    logger.warning("Batch metadata lookup failed, posting links conditionally: %s", e)
+                    return None
+            return linked
+
+        def _engagement_of(f: dict) -> Any:
+            """Embedded engagement dict, engagement id to fetch, or None."""
+            test = f.get("test")
+            if not isinstance(test, dict):
+                # With related_fields=true "test" is an id and the expanded test lives under related_fields
+                test = (f.get("related_fields") or _EMPTY).get("test") or _EMPTY
+            eng = test.get("engagement")
+            if isinstance(eng, (dict, int)):
+                return eng
+            eng = f.get("engagement")
+            return eng if isinstance(eng, dict) else None
+
+        def _candidate(f: dict) -> Optional[Tuple[int, str, Any]]:
+            """(id, file_path, engagement) pulled out once per finding; None if it can never be linked.
+
+            Local checks only: findings failing these never need a metadata lookup or a post.
+            """
+            fid = f.get("id")
+            file_path = f.get("file_path")
+            if not fid or not file_path:
+                return None
+            eng = _engagement_of(f)
+            if eng is None or (isinstance(eng, dict) and not eng.get("source_code_management_uri")):
+                return None
+            return int(fid), file_path, eng
+
+        def _process_one_finding(item: Tuple[int, str, Any], linked: Optional[Set[int]],
+                                 posted: List[Tuple[int, Optional[str]]]) -> int:
+            fid, file_path, eng = item
             try:
-                fid = f.get("id")
-                file_path = f.get("file_path") or ""
-                if not fid or not file_path:
-                    return 0
-
                 # Resolve engagement: prefer embedded, else fetch by id with cache
-                eng = None
-                test = f.get("test") or {}
-                eng_obj = test.get("engagement")
-                if isinstance(eng_obj, dict):
-                    eng = eng_obj
-                elif isinstance(eng_obj, int):
-                    eng = self.fetch_engagement(eng_obj, eng_cache, eng_cache_lock)
-
-                if eng is None and isinstance(f.get("engagement"), dict):
-                    eng = f.get("engagement")
-
+                if isinstance(eng, int):
+                    eng = self.fetch_engagement(eng, eng_cache, eng_cache_lock)
                 if not isinstance(eng, dict):
                     return 0
 
@@ -247,40 +367,82 @@ class SastPipelineDDClient(DefectDojoClient):
                 if not repo_url:
                     return 0
 
-                if only_missing and self.has_sourcefile_link(int(fid)):
+                if only_missing and linked is not None and fid in linked:
                     return 0
 
                 link = linker.build(repo_url, file_path, ref)
                 if not link:
                     return 0
 
-                self.post_finding_meta_json(int(fid), "sourcefile_link", link)
+                if only_missing and linked is None:
+                    # Presence unknown: one conditional POST instead of GET metadata + POST
+                    created = self.post_finding_meta_if_absent(fid, "sourcefile_link", link)
+                    posted.append((fid, link if created else None))
+                    return int(created)
+
+                if only_missing:
+                    self.post_finding_meta_json(fid, "sourcefile_link", link)
+                else:
+                    # Refresh run: existing links are overwritten rather than rejected as duplicates
+                    self.upsert_finding_meta(fid, "sourcefile_link", link)
+                posted.append((fid, link))
                 return 1
             except Exception as e:
-                logger.warning("Failed to enrich finding id=%s: %s", f.get("id"), e)
+                if _is_auth_error(e):
+                    if not auth_failed.is_set():
+                        auth_failed.set()
+                        logger.error("DefectDojo rejected the token (%s); stopping enrichment", e)
+                    return 0
+                logger.warning("Failed to enrich finding id=%s: %s", fid, e)
                 return 0
 
-        while True:
-            page_params = dict(params, offset=offset)
-            j = self.list_findings(**page_params)
-            findings = j.get("results", [])
-            if not findings:
-                break
-
-            processed_on_page = 0
-            with ThreadPoolExecutor(max_workers=max_workers) as ex:
-                futures = [ex.submit(_process_one_finding, f) for f in findings]
-                for fut in as_completed(futures):
-                    processed_on_page += fut.result()
-                    if processed_on_page and processed_on_page % 100 == 0:
-                        logger.info("Processed %d findings on this page", processed_on_page)
-
-            updated_total += processed_on_page
-            logger.info("Page done: +%d updated (total: %d)", processed_on_page, updated_total)
-
-            if not j.get("next"):
-                break
-            offset += params["limit"]
+        pages = self._iter_pages(self.list_findings, **params)
+        # Optional cross-run record of linked findings; only touched from this thread
+        cache = open_enrich_cache(self.base) if only_missing else None
+
+        # Double-buffered: the next page is fetched while the current one is being enriched
+        with ThreadPoolExecutor(max_workers=1) as prefetcher, ThreadPoolExecutor(max_workers=max_workers) as ex:
+            pending = prefetcher.submit(next, pages, None)
+            try:
+                while True:
+                    j = pending.result()
+                    findings = (j or {}).get("results", [])
+                    if not findings:
+                        break
+                    pending = prefetcher.submit(next, pages, None)
+
+                    extracted = [(f, c) for f in findings if (c := _candidate(f)) is not None]
+                    if cache is not None:
+                        cached = cache.known(c[0] for _, c in extracted)
+                        extracted = [(f, c) for f, c in extracted if c[0] not in cached]
+                    linked = _linked_ids([f for f, _ in extracted]) if only_missing else set()
+                    items = [c for _, c in extracted]
+                    posted: List[Tuple[int, Optional[str]]] = []
+                    progress = itertools.count(1)
+
+                    def _process_chunk(chunk: List[Tuple[int, str, Any]]) -> int:
+                        done = 0
+                        for item in chunk:
+                            if auth_failed.is_set():
+                                break
+                            if _process_one_finding(item, linked, posted):
+                                done += 1
+                                n = next(progress)
+                                if n % 100 == 0:
+                                    logger.info("Processed %d findings on this page", n)
+                        return done
+
+                    processed_on_page = sum(ex.map(_process_chunk, _chunked(items, max_workers)))
+                    if cache is not None:
+                        cache.add([(fid, None) for fid in linked or ()] + posted)
+
+                    updated_total += processed_on_page
+                    logger.info("Page done: +%d updated (total: %d)", processed_on_page, updated_total)
+                    if auth_failed.is_set():
+                        break
+            finally:
+                if cache is not None:
+                    cache.close()
 
         logger.info("Bulk enrichment complete. Updated findings: %s", updated_total)
         return updated_total
@@ -1,25 +1,27 @@
 """Backward-compatible function layer (exact signatures, same REST semantics)."""
 from __future__ import annotations
 
+import functools
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import yaml  # type: ignore
-
-from pipeline.config_utils import AnalyzersConfigHelper  # import from parent as requested
+from pipeline.config_utils import AnalyzersConfigHelper, read_yaml_cached  # import from parent as requested
 from .client import DojoConfig, DefectDojoClient, ImportResult
-from .sast_client import SastPipelineDDClient
+from .sast_client import ENGAGEMENT_NAME_MODES, SastPipelineDDClient, enrich_workers
 from .repo_info import read_repo_params  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+DELETE_CHUNK_SIZE = 100
+MAX_PARALLEL_UPLOADS = 8
+
 
 def load_dojo_config(config_path: str) -> DojoConfig:
     """Load YAML config exactly like original (with env overrides)."""
-    with open(config_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    data = read_yaml_cached(config_path)
 
     dd = data.get("defectdojo", {}) or {}
     url = os.environ.get("DEFECTDOJO_URL") or dd.get("url") or ""
@@ -34,7 +36,7 @@ def load_dojo_config(config_path: str) -> DojoConfig:
     verify_ssl = _parse_bool(os.environ.get("DEFECTDOJO_VERIFY_SSL"), bool(dd.get("verify_ssl", True)))
     minimum_severity = os.environ.get("DEFECTDOJO_MIN_SEVERITY") or dd.get("minimum_severity", "Info")
     name_mode = dd.get("name_mode", "analyzer-sha")
-    if name_mode not in ("analyzer", "analyzer-branch", "analyzer-sha"):
+    if name_mode not in ENGAGEMENT_NAME_MODES:
         logger.warning("Unknown name_mode '%s'; falling back to 'analyzer-sha'", name_mode)
         name_mode = "analyzer-sha"
     engagement_status = os.environ.get("DEFECTDOJO_DEFAULT_ENGAGEMENT_STATUS") or dd.get("engagement_status", "In Progress")
@@ -43,11 +45,21 @@ def load_dojo_config(config_path: str) -> DojoConfig:
 
 
 # analyzers + scan_type
+# Lower-cased output_type -> DefectDojo scan type; anything else is passed through unchanged
+_SCAN_TYPE_ALIASES: Dict[str, str] = {
+    "sarif": "SARIF",
+    "xml": "Generic XML Import",
+    "generic-xml": "Generic XML Import",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _scan_type_for(output_type: str) -> str:
+    return _SCAN_TYPE_ALIASES.get(output_type.lower(), output_type)
+
+
 def resolve_scan_type(analyzer) -> str:
-    ot = analyzer.get("output_type", "SARIF")
-    if ot.lower() in ("xml", "generic-xml"):
-        return "Generic XML Import"
-    return ot
+    return _scan_type_for(analyzer.get("output_type", "SARIF"))
 
 
 # Public API: identical signature
@@ -69,32 +81,61 @@ def upload_results(
     results: List[ImportResult] = []
     cfg_helper = AnalyzersConfigHelper(analyzers_cfg_path)
 
-    # Repo info
-    repo_params = read_repo_params(repo_path or os.environ.get("GIT_REPO_PATH", ".."))
     client = SastPipelineDDClient(cfg, token)
 
-    for analyzer in cfg_helper.get_analyzers():
-        analyzer_name = analyzer.get("name")
-        report_path = os.path.join(output_dir, cfg_helper.get_analyzer_result_file_name(analyzer))
+    # Resolve per-analyzer report path and scan type once, up front
+    planned = tuple(
+        (a.get("name"), os.path.join(output_dir, cfg_helper.get_analyzer_result_file_name(a)), resolve_scan_type(a))
+        for a in cfg_helper.get_analyzers()
+    )
+    jobs: List[Tuple[str, str, str]] = []
+    for analyzer_name, report_path, scan_type in planned:
         if not os.path.exists(report_path):
             logging.error(f"No result on expected path {report_path} for analyzer {analyzer_name}")
             continue
-        scan_type = resolve_scan_type(analyzer)
         logger.info("Processing report: %s (analyzer=%s, scan_type=%s)", report_path, analyzer_name, scan_type)
+        jobs.append((analyzer_name, report_path, scan_type))
+
+    if not jobs:
+        return results
 
+    # Repo info: the git subprocess runs while the product lookup/creation is in flight.
+    # get_or_create_product is memoized on the client, so every report below reuses it.
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        repo_fut = ex.submit(read_repo_params, repo_path or os.environ.get("GIT_REPO_PATH", ".."))
         try:
-            res = client.upload_report(
-                analyzer_name=analyzer_name,
-                product_name=product_name,
-                scan_type=scan_type,
-                report_path=report_path,
-                repo_params=repo_params,
-                trim_path=trim_path
-            )
-            results.append(res)
+            client.get_or_create_product(product_name)
         except Exception as exc:
-            logger.error(f"Error during uploading report. {exc} Continue")
+            # upload_report retries the lookup and reports the failure per analyzer
+            logger.warning("Product lookup for '%s' failed: %s", product_name, exc)
+        repo_params = repo_fut.result()
+
+    def _upload(job: Tuple[str, str, str]) -> ImportResult:
+        analyzer_name, report_path, scan_type = job
+        return client.upload_report(
+            analyzer_name=analyzer_name,
+            product_name=product_name,
+            scan_type=scan_type,
+            report_path=report_path,
+            repo_params=repo_params,
+            trim_path=trim_path,
+            executor=enrich_pool,
+        )
+
+    # Reports are independent HTTP flows; upload them concurrently and keep analyzer order in the result.
+    # Enrichment of every report shares one pool; it is separate from the upload pool so
+    # upload threads waiting on enrichment can never starve it.
+    done: Dict[int, ImportResult] = {}
+    with ThreadPoolExecutor(max_workers=enrich_workers()) as enrich_pool, \
+            ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_UPLOADS, len(jobs))) as ex:
+        futures = {ex.submit(_upload, job): idx for idx, job in enumerate(jobs)}
+        for fut in as_completed(futures):
+            try:
+                done[futures[fut]] = fut.result()
+            except Exception as exc:
+                logger.error(f"Error during uploading report. {exc} Continue")
 
+    results.extend(done[idx] for idx in sorted(done))
     return results
 
 
@@ -140,23 +181,14 @@ def delete_findings_by_product_and_path_prefix(
     if dry_run or matched == 0:
         return matched, 0
 
-    # Not aggressive (mirror original)
+    # Not aggressive (mirror original). DefectDojo has no bulk delete, so each worker
+    # deletes a chunk of ids over one keep-alive connection instead of one request per task.
     max_workers = max(1, min(8, (os.cpu_count() or 4)))
+    file_paths = dict(items)
+    ids = list(file_paths)
+    chunks = [ids[i:i + DELETE_CHUNK_SIZE] for i in range(0, len(ids), DELETE_CHUNK_SIZE)]
 
-    def _delete_one(fid_fp):
-        fid, fp = fid_fp
-        try:
-            client.delete_finding(fid)
-            return 1
-        except Exception as e:
-            logger.warning("Failed to delete finding id=%s file_path=%s: %s", fid, fp, e)
-            return 0
-
-    processed = 0
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futures = [ex.submit(_delete_one, item) for item in items]
-        for fut in as_completed(futures):
-            processed += fut.result()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as ex:
+        processed = sum(ex.map(functools.partial(client.delete_findings, file_paths=file_paths), chunks))
 
     return matched, processed
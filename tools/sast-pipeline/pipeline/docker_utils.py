@@ -16,113 +16,225 @@ import re
 import uuid
 import selectors
 import logging
-from typing import Dict, Optional, Iterable
+import threading
+from typing import IO, Dict, Optional, Iterable, cast
 
 log = logging.getLogger(__name__)
 
 def get_pipeline_id() -> str:
-    return uuid.uuid4().hex[:8]
+    """Pipeline ID for this run: ``PIPELINE_ID`` if set, else a new one.
+
+    A generated ID is exported to ``PIPELINE_ID`` so later calls, and child
+    processes, reuse it instead of minting another.
+    """
+    pipeline_id = os.environ.get("PIPELINE_ID")
+    if not pipeline_id:
+        pipeline_id = os.environ["PIPELINE_ID"] = uuid.uuid4().bytes[:4].hex()
+    return pipeline_id
+
+def env_flag(name: str, default: bool = True) -> bool:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    val = raw.strip().lower()
+    if val in {"1", "true", "yes", "y", "on"}:
+        return True
+    if val in {"0", "false", "no", "n", "off"}:
+        return False
+
+    return default
 
 def construct_container_name(image: str, pipeline_id: str) -> str:
     # Construct container name with pipeline ID if available
     return f"sast_{image}_{pipeline_id}"
 
+# Images seen present during this run. Only positive answers are kept: an image found once stays
+# until this process removes it, while a missing one may still be built or pulled by someone else.
+_PRESENT_IMAGES: set[str] = set()
+_PRESENT_IMAGES_LOCK = threading.Lock()
+_image_index_loaded = False
+
+
+def _image_key(image_name: str) -> str:
+    # "name" and "name:latest" refer to the same image; store and look up one spelling
+    return image_name[:-len(":latest")] if image_name.endswith(":latest") else image_name
+
+
+def _load_image_index() -> None:
+    """Seed _PRESENT_IMAGES from one ``docker images`` listing (once per process).
+
+    Saves a docker invocation per analyzer image on startup. Names the listing
+    cannot express (digests, short ids) still fall back to ``docker image inspect``.
+    """
+    global _image_index_loaded
+    with _PRESENT_IMAGES_LOCK:
+        if _image_index_loaded:
+            return
+        _image_index_loaded = True
+        try:
+            result = subprocess.run(
+                ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except OSError as exc:
+            log.debug("Could not list docker images: %s", exc)
+            return
+        for ref in result.stdout.split():
+            if not ref.rpartition(":")[0] or "<none>" in ref:
+                continue
+            _PRESENT_IMAGES.add(_image_key(ref))
+
+
+def _reset_image_cache() -> None:
+    global _image_index_loaded
+    with _PRESENT_IMAGES_LOCK:
+        _PRESENT_IMAGES.clear()
+        _image_index_loaded = False
+
+
 def image_exists(image_name: str) -> bool:
     """Check whether a Docker image is present locally.
 
-    A small wrapper around ``docker images -q``. Returns True if the
-    image has been built/pulled already, or False otherwise.
+    A small wrapper around ``docker image inspect``: only its exit code is
+    used. Returns True if the image has been built/pulled already, or False
+    otherwise. Images already seen in this process, or listed by the
+    one-off index query, are answered without running docker again.
     """
+    key = _image_key(image_name)
+    if key in _PRESENT_IMAGES:
+        return True
+    if not _image_index_loaded:
+        _load_image_index()
+        if key in _PRESENT_IMAGES:
+            return True
     result = subprocess.run(
-        ["docker", "images", "-q", image_name],
-        stdout=subprocess.PIPE,
+        ["docker", "image", "inspect", "--format", "{{.Id}}", image_name],
+        stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL,
-        text=True,
     )
-    return result.stdout.strip() != ""
+    exists = result.returncode == 0
+    if exists:
+        _remember_image(image_name)
+    return exists
+
+
+def _remember_image(image_name: str) -> None:
+    with _PRESENT_IMAGES_LOCK:
+        _PRESENT_IMAGES.add(_image_key(image_name))
+
+
+def _forget_image(image_name: str) -> None:
+    with _PRESENT_IMAGES_LOCK:
+        _PRESENT_IMAGES.discard(_image_key(image_name))
 
 
 _LEVEL_TOKEN_RE = re.compile(r'\[(DEBUG|INFO|WARNING|WARN|ERROR|ERR|CRITICAL|CRIT)\]', re.IGNORECASE)
 
+# [LEVEL] token (upper-cased) -> logging level
+_TOKEN_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARN": logging.WARNING,
+    "WARNING": logging.WARNING,
+    "ERR": logging.ERROR,
+    "ERROR": logging.ERROR,
+    "CRIT": logging.CRITICAL,
+    "CRITICAL": logging.CRITICAL,
+}
+# Lines without a token: stderr -> WARNING, stdout -> INFO
+_STREAM_LEVELS = {"stderr": logging.WARNING}
+
+
 def _log_container_line(line: str, stream: str = "stdout", log_addition:str = "") -> None:
     text = line.rstrip("\r\n")
 
-    last = None
-    for last in _LEVEL_TOKEN_RE.finditer(text):
-        pass
-
-    if last:
-        level = last.group(1).upper()
-        msg = log_addition + text[last.end():].lstrip()
-
-        if level in ("WARN", "WARNING"):
-            log.warning(msg); return
-        if level in ("ERR", "ERROR"):
-            log.error(msg); return
-        if level in ("CRIT", "CRITICAL"):
-            log.critical(msg); return
-        if level == "DEBUG":
-            log.debug(msg); return
-        # INFO by default
-        log.info(msg); return
-
-    # fallback: if there is no [LEVEL] — stderr -> WARNING, stdout -> INFO
-    if stream == "stderr":
-        log.warning(log_addition + text)
-    else:
-        log.info(log_addition + text)
+    # The last [LEVEL] token wins. It is almost always the last bracket on
+    # the line, so check that first and only regex-scan when an earlier
+    # bracket could still hold a token.
+    i = text.rfind("[")
+    end = -1
+    if i != -1:
+        j = text.find("]", i + 1)
+        level = _TOKEN_LEVELS.get(text[i + 1:j].upper()) if 0 < j - i <= 9 else None
+        if level is not None:
+            end = j + 1
+        elif text.find("[", 0, i) != -1:
+            last = None
+            for last in _LEVEL_TOKEN_RE.finditer(text, 0, i):
+                pass
+            if last:
+                level = _TOKEN_LEVELS[last.group(1).upper()]
+                end = last.end()
+
+    if end != -1:
+        if log.isEnabledFor(level):
+            log.log(level, log_addition + text[end:].lstrip())
+        return
+
+    level = _STREAM_LEVELS.get(stream, logging.INFO)
+    if log.isEnabledFor(level):
+        log.log(level, log_addition + text)
+
+
+_READ_CHUNK = 64 * 1024
+
+# Build output lines with a standalone "error" or "failed" (any case) are logged as errors.
+# Hyphenated names such as libgpg-error-l10n in apt output do not count.
+_BUILD_ERROR_RE = re.compile(r"(?<![\w-])(?:error|failed)(?![\w-])", re.IGNORECASE)
+
 
 def run_logged_cmd(cmd, log_addition=""):
+    """Run ``cmd`` and log its stdout/stderr line by line as they arrive.
+
+    Both pipes are multiplexed with a selector and read in raw chunks, so a
+    chatty stderr can never block the child while stdout is being drained.
+    A line split across two reads is held back until its newline arrives.
+    """
     with subprocess.Popen(
         cmd,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
-        bufsize=0,   # без доп. буферизации в Python
+        bufsize=0,
     ) as proc:
-        assert proc.stdout and proc.stderr
-        # Сделать пайпы неблокирующими
-        os.set_blocking(proc.stdout.fileno(), False)
-        os.set_blocking(proc.stderr.fileno(), False)
-
+        # Both pipes exist: Popen was asked for PIPE on each
         sel = selectors.DefaultSelector()
-        sel.register(proc.stdout, selectors.EVENT_READ, data=("stdout", proc.stdout))
-        sel.register(proc.stderr, selectors.EVENT_READ, data=("stderr", proc.stderr))
+        sel.register(cast(IO[bytes], proc.stdout), selectors.EVENT_READ, data="stdout")
+        sel.register(cast(IO[bytes], proc.stderr), selectors.EVENT_READ, data="stderr")
+        tails = {"stdout": b"", "stderr": b""}
+
+        def _emit(raw: bytes, stream_name: str) -> None:
+            _log_container_line(raw.decode("utf-8", "replace"), stream=stream_name, log_addition=log_addition)
 
         try:
-            while True:
-                events = sel.select(timeout=0.1)  # small timeout
-                for key, _ in events:
-                    stream_name, fileobj = key.data
-                    chunk = fileobj.read()
-                    if chunk:  # if several chunks without \n
-                        for line in chunk.splitlines():
-                            _log_container_line(line, stream=stream_name, log_addition=log_addition)
-                    else:
-                        # EOF
-                        sel.unregister(fileobj)
-
-                # exit when process is exit and threads is finished
-                if proc.poll() is not None and not sel.get_map():
-                    break
+            while sel.get_map():
+                for key, _ in sel.select():
+                    stream_name = key.data
+                    chunk = os.read(key.fd, _READ_CHUNK)
+                    if not chunk:
+                        # EOF: flush an unterminated last line
+                        sel.unregister(key.fileobj)
+                        if tails[stream_name]:
+                            _emit(tails[stream_name], stream_name)
+                            tails[stream_name] = b""
+                        continue
+                    *lines, tails[stream_name] = (tails[stream_name] + chunk).split(b"\n")
+                    for line in lines:
+                        _emit(line, stream_name)
 
             returncode = proc.wait()
             if returncode != 0:
                 raise subprocess.CalledProcessError(returncode, cmd)
             return None
         finally:
-            # close related resources
-            for key in list(sel.get_map().values()):
-                try:
-                    sel.unregister(key.fileobj)
-                except Exception:
-                    pass
             sel.close()
 
 def delete_image_if_exist(image_name):
     if not image_exists(image_name):
         return
 
+    _forget_image(image_name)
     run_logged_cmd(["docker", "image", "rm", image_name])
 
 
@@ -193,8 +305,8 @@ def build_image(
 
     This helper constructs a ``docker build`` command and either streams
     the build output to the logger or captures it.  Lines containing
-    ``error``, ``Error`` or ``failed`` are logged as errors; all other
-    lines are logged at INFO level.
+    the word ``error`` or ``failed`` (any case) are logged as errors; all
+    other lines are logged at ``default_log_level``.
 
     :param image_name: Tag/name to assign to the built image.
     :param context_dir: Path to the build context (the directory containing the Dockerfile).
@@ -212,6 +324,14 @@ def build_image(
     # Custom Dockerfile if provided
     if dockerfile:
         cmd += ["-f", dockerfile]
+    # BuildKit unless the caller's environment turns it off; plain progress
+    # keeps its output one event per line when piped. The legacy builder
+    # rejects --progress, so it is only added when BuildKit is on.
+    env = os.environ.copy()
+    buildkit = env_flag("DOCKER_BUILDKIT", True)
+    env["DOCKER_BUILDKIT"] = "1" if buildkit else "0"
+    if buildkit:
+        cmd += ["--progress=plain"]
     # Context directory
     cmd += ["."]
 
@@ -219,15 +339,12 @@ def build_image(
     def log_build_line(line: str, log_level: str) -> None:
         if not line:
             return
-        txt = line.strip()
-        lower = txt.lower()
-        if " error " in lower or " failed " in lower:
-            log.error(f"[build {image_name}] {txt}")
+        if _BUILD_ERROR_RE.search(line):
+            level = logging.ERROR
         else:
-            if log_level == "INFO":
-                log.info(f"[build {image_name}] {txt}")
-            else:
-                log.debug(f"[build {image_name}] {txt}")
+            level = logging.INFO if log_level == "INFO" else logging.DEBUG
+        if log.isEnabledFor(level):
+            log.log(level, "[build %s] %s", image_name, line.strip())
 
     with subprocess.Popen(
         cmd,
@@ -236,13 +353,16 @@ def build_image(
         text=True,
         cwd=context_dir,
         bufsize=1,
+        env=env,
     ) as proc:
-        assert proc.stdout is not None
-        for line in proc.stdout:
+        for line in cast(IO[str], proc.stdout):
             log_build_line(line, default_log_level)
         returncode = proc.wait()
         if check and returncode != 0:
             raise subprocess.CalledProcessError(returncode, cmd)
+    if returncode == 0:
+        # The next image_exists for this tag is answered without asking docker
+        _remember_image(image_name)
 
 def cleanup_pipeline_containers(pipeline_id: str) -> None:
     """Remove all Docker containers associated with the given pipeline ID.
@@ -277,7 +397,19 @@ def cleanup_pipeline_containers(pipeline_id: str) -> None:
         names = [line.strip() for line in result.stdout.splitlines() if line.strip()]
         if not names:
             return
+        # One ``docker rm`` for all of them; it prints each name it removed
+        result = subprocess.run(
+            ["docker", "rm", "-f", *names],
+            text=True,
+            capture_output=True,
+            check=False,
+        )
+        removed = set(result.stdout.split())
         for name in names:
+            if result.returncode == 0 or name in removed:
+                log.info("Removed pipeline container %s", name)
+                continue
+            # Partial failure: retry the rest one by one to log each error
             try:
                 run_logged_cmd(["docker", "rm", "-f", name])
                 log.info("Removed pipeline container %s", name)
@@ -22,7 +22,6 @@ from pipeline.project_builder import configure_project_run_analyses
 #from pipeline.defectdojo_api import upload_results
 from pipeline.defect_dojo.utils import upload_results
 from pipeline.docker_utils import get_pipeline_id
-import yaml  # type: ignore
 import pipeline.config_utils as config_utils
 
 log = logging.getLogger(__name__)
@@ -52,8 +51,7 @@ def load_config(path: str) -> dict:
              file could not be loaded.
     """
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
+        return config_utils.read_yaml_cached(path)
     except FileNotFoundError:
         raise FileNotFoundError(f"Configuration file not found: {path}")
     except Exception as exc:
@@ -18,3 +18,11 @@ def dojo_token(monkeypatch):
     # Ensure code paths that read DEFECTDOJO_TOKEN do not fail
     monkeypatch.setenv("DEFECTDOJO_TOKEN", "test-token")
     return "test-token"
+
+@pytest.fixture(autouse=True)
+def _clear_engagement_cache():
+    # Engagements are cached per process; keep tests independent of each other
+    from pipeline.defect_dojo import client
+    client._ENGAGEMENT_CACHE.clear()
+    yield
+    client._ENGAGEMENT_CACHE.clear()
@@ -14,3 +14,19 @@ def test_load_dojo_config_requires_url(tmp_path, monkeypatch):
 
     with pytest.raises(ValueError):
         load_dojo_config(str(cfg_path))
+
+
+def test_load_dojo_config_rereads_edited_file_and_applies_env(tmp_path, monkeypatch):
+    cfg_path = tmp_path / "dojo.yaml"
+    cfg_path.write_text(yaml.safe_dump({"defectdojo": {"url": "https://a.example"}}))
+    monkeypatch.delenv("DEFECTDOJO_URL", raising=False)
+    assert load_dojo_config(str(cfg_path)).url == "https://a.example"
+
+    cfg_path.write_text(yaml.safe_dump({"defectdojo": {"url": "https://b.example"}}))
+    st = os.stat(cfg_path)
+    os.utime(cfg_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert load_dojo_config(str(cfg_path)).url == "https://b.example"
+
+    # Env overrides still apply on top of the cached parse
+    monkeypatch.setenv("DEFECTDOJO_URL", "https://env.example/")
+    assert load_dojo_config(str(cfg_path)).url == "https://env.example"
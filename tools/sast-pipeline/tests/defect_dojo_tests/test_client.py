@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import responses
 
 from pipeline.defect_dojo.client import DojoConfig, DefectDojoClient
@@ -32,7 +35,8 @@ def test_ensure_engagement_create_and_patch(dojo_base_url, dojo_token):
     )
     assert eng["id"] == 11
 
-    # 2) Engagement exists but fields differ -> PATCH
+    # 2) Engagement exists but fields differ -> PATCH (new client: nothing cached yet)
+    client = DefectDojoClient(cfg, dojo_token)
     responses.reset()
     responses.add(
         responses.GET, f"{dojo_base_url}/api/v2/engagements/",
@@ -51,6 +55,22 @@ def test_ensure_engagement_create_and_patch(dojo_base_url, dojo_token):
     assert eng2["source_code_management_uri"] == "https://git/repo"
 
 
+@responses.activate
+def test_ensure_engagement_reuses_known_engagement(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = DefectDojoClient(cfg, dojo_token)
+    eng = {"id": 11, "product": 1, "name": "an-abc", "source_code_management_uri": "https://git/repo",
+           "branch_tag": "main", "commit_hash": "abc12345"}
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/engagements/",
+                  json={"results": [eng], "next": None}, status=200)
+
+    for _ in range(3):
+        got = client.ensure_engagement(product_id=1, name="an-abc", repo_url="https://git/repo",
+                                       branch_tag="main", commit_hash="abc12345")
+        assert got["id"] == 11
+    assert len(responses.calls) == 1
+
+
 @responses.activate
 def test_get_or_create_product(dojo_base_url, dojo_token):
     cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
@@ -68,7 +88,12 @@ def test_get_or_create_product(dojo_base_url, dojo_token):
     p = client.get_or_create_product("MyProduct")
     assert p["id"] == 7
 
+    # Same client: resolved once, no further lookups
+    assert client.get_or_create_product("MyProduct")["id"] == 7
+    assert len(responses.calls) == 2
+
     # Found by name -> returns first
+    client = DefectDojoClient(cfg, dojo_token)
     responses.reset()
     responses.add(
         responses.GET, f"{dojo_base_url}/api/v2/products/",
@@ -76,3 +101,84 @@ def test_get_or_create_product(dojo_base_url, dojo_token):
     )
     p = client.get_or_create_product("MyProduct")
     assert p["id"] == 9
+
+
+@responses.activate
+def test_fetch_engagement_concurrent_misses_issue_one_get(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = DefectDojoClient(cfg, dojo_token)
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/engagements/5/",
+                  json={"id": 5, "source_code_management_uri": "https://git/repo"}, status=200)
+
+    cache, lock = {}, threading.Lock()
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        engs = list(ex.map(lambda _: client.fetch_engagement(5, cache, lock), range(32)))
+
+    assert all(e["id"] == 5 for e in engs)
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_fetch_engagement_reused_across_runs_until_ttl(monkeypatch, dojo_base_url, dojo_token):
+    from pipeline.defect_dojo import client as client_mod
+
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/engagements/5/", json={"id": 5}, status=200)
+
+    # Each enrichment run has its own per-call cache; the process-wide one spans them
+    for _ in range(2):
+        DefectDojoClient(cfg, dojo_token).fetch_engagement(5, {}, threading.Lock())
+    assert len(responses.calls) == 1
+
+    monkeypatch.setattr(client_mod, "ENGAGEMENT_CACHE_TTL", 0.0)
+    DefectDojoClient(cfg, dojo_token).fetch_engagement(5, {}, threading.Lock())
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_post_finding_meta_json_reuses_template_per_finding(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = DefectDojoClient(cfg, dojo_token)
+    for fid in (1, 2):
+        responses.add(responses.POST, f"{dojo_base_url}/api/v2/findings/{fid}/metadata/",
+                      match=[responses.matchers.json_params_matcher({"name": "sourcefile_link", "value": f"v{fid}"})],
+                      json={}, status=201)
+
+    client.post_finding_meta_json(1, "sourcefile_link", "v1")
+    client.post_finding_meta_json(2, "sourcefile_link", "v2")
+
+    assert [c.request.headers["Authorization"] for c in responses.calls] == [f"Token {dojo_token}"] * 2
+
+
+@responses.activate
+def test_finding_ids_with_meta_falls_back_when_filter_ignored(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = DefectDojoClient(cfg, dojo_token)
+    # Server ignores finding__in and lists metadata of unrelated findings
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/metadata/",
+                  json={"results": [{"finding": 99, "name": "sourcefile_link"}],
+                        "next": f"{dojo_base_url}/api/v2/metadata/?offset=200"})
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/findings/1/metadata/",
+                  json={"results": [{"name": "sourcefile_link", "value": "x"}]})
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/findings/2/metadata/", json={"results": []})
+
+    assert client.get_finding_ids_with_meta([1, 2], "sourcefile_link") == {1}
+    # The unfiltered listing is abandoned after its first page
+    assert sum("/api/v2/metadata/" in c.request.url for c in responses.calls) == 1
+
+
+def test_clients_for_same_server_share_session(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    a, b = DefectDojoClient(cfg, dojo_token), DefectDojoClient(DojoConfig(url=dojo_base_url + "/"), dojo_token)
+    assert a.session is b.session
+    assert DefectDojoClient(cfg, dojo_token + "x").session is not a.session
+
+
+def test_session_resolves_proxy_environment_once(monkeypatch, dojo_token):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.local:3128")
+    monkeypatch.setenv("NO_PROXY", "")
+    monkeypatch.setenv("REQUESTS_CA_BUNDLE", "/etc/ssl/corp.pem")
+    session = DefectDojoClient(DojoConfig(url="https://dojo-proxy.example", verify_ssl=True), dojo_token).session
+    assert session.trust_env is False
+    assert session.proxies.get("https") == "http://proxy.local:3128"
+    assert session.verify == "/etc/ssl/corp.pem"
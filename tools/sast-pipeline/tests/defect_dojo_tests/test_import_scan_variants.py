@@ -37,7 +37,7 @@ def test_import_scan_returns_test_dict(tmp_path, dojo_base_url, dojo_token):
 
     # Fetch findings for test 41
     responses.add(responses.GET, f"{dojo_base_url}/api/v2/findings/",
-                  match=[responses.matchers.query_param_matcher({"test":"41","limit":"200","offset":"0"})],
+                  match=[responses.matchers.query_param_matcher({"test":"41","o":"id","limit":"200"})],
                   json={"results":[{"id":1,"file_path":"src/a.py","test":{"id":41}}], "next": None}, status=200)
 
     # No trim/enrich to keep it simple
@@ -56,7 +56,7 @@ def test_import_scan_returns_test_int(tmp_path, dojo_base_url, dojo_token):
     responses.add(responses.POST, f"{dojo_base_url}/api/v2/import-scan/",
                   json={"test": 42}, status=200)
     responses.add(responses.GET, f"{dojo_base_url}/api/v2/findings/",
-                  match=[responses.matchers.query_param_matcher({"test":"42","limit":"200","offset":"0"})],
+                  match=[responses.matchers.query_param_matcher({"test":"42","o":"id","limit":"200"})],
                   json={"results":[{"id":2,"file_path":"src/b.py","test":{"id":42}}], "next": None}, status=200)
 
     rpt = tmp_path / "r.sarif"; rpt.write_text("{}")
@@ -83,3 +83,47 @@ def test_import_scan_returns_findings_list(tmp_path, dojo_base_url, dojo_token):
     rpt = tmp_path / "r.sarif"; rpt.write_text("{}")
     res = client.upload_report("an","Prod","SARIF",str(rpt), RepoParams(), trim_path="")
     assert res.imported_findings == 2
+
+
+@responses.activate
+def test_import_scan_findings_list_fetched_in_bulk(tmp_path, dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = SastPipelineDDClient(cfg, dojo_token)
+    _common_setup(dojo_base_url)
+
+    responses.add(responses.POST, f"{dojo_base_url}/api/v2/import-scan/",
+                  json={"findings": [101, {"id": 102}, 103]}, status=200)
+    # One filtered listing returns two of three; the missing id is fetched on its own
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/findings/",
+                  match=[responses.matchers.query_param_matcher({"id": "101,102,103", "limit": "3"})],
+                  json={"results": [{"id": 102, "file_path": "src/y.py"}, {"id": 101, "file_path": "src/x.py"}],
+                        "next": None}, status=200)
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/findings/103/",
+                  json={"id": 103, "file_path": "src/z.py"}, status=200)
+
+    rpt = tmp_path / "r.sarif"; rpt.write_text("{}")
+    res = client.upload_report("an", "Prod", "SARIF", str(rpt), RepoParams(), trim_path="")
+    assert res.imported_findings == 3
+    assert [c.request.url for c in responses.calls].count(f"{dojo_base_url}/api/v2/findings/101/") == 0
+    # Input order is kept even though the listing returned 102 first
+    assert [f["id"] for f in client.get_findings_by_ids([101, 102, 103])] == [101, 102, 103]
+
+
+@responses.activate
+def test_upload_report_skips_enrichment_without_repo_or_trim(tmp_path, dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = SastPipelineDDClient(cfg, dojo_token)
+    _common_setup(dojo_base_url)
+
+    responses.add(responses.POST, f"{dojo_base_url}/api/v2/import-scan/", json={"test": 43}, status=200)
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/findings/",
+                  json={"results": [{"id": 3, "file_path": "src/c.py"}], "next": None}, status=200)
+
+    class NoWorkExecutor:
+        def map(self, *_):
+            raise AssertionError("enrichment should have been skipped")
+
+    rpt = tmp_path / "r.sarif"; rpt.write_text("{}")
+    res = client.upload_report("an", "Prod", "SARIF", str(rpt), RepoParams(), trim_path="", executor=NoWorkExecutor())
+    assert res.imported_findings == 1
+    assert res.enriched_count == 0
@@ -28,6 +28,60 @@ def test_iter_findings_two_pages(dojo_base_url, dojo_token):
     assert ids == [1,2,3]
 
 
+@responses.activate
+def test_iter_findings_uses_keyset_params(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = DefectDojoClient(cfg, dojo_token)
+
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        match=[responses.matchers.query_param_matcher({"o": "id", "limit": "2"})],
+        json={"results": [{"id": 5}, {"id": 9}], "next": f"{dojo_base_url}/api/v2/findings/?id__gt=9"},
+        status=200
+    )
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        match=[responses.matchers.query_param_matcher({"o": "id", "limit": "2", "id__gt": "9"})],
+        json={"results": [{"id": 12}], "next": None},
+        status=200
+    )
+
+    assert [f["id"] for f in client.iter_findings(limit=2)] == [5, 9, 12]
+
+
+@responses.activate
+def test_iter_findings_falls_back_to_offset_when_id_filter_ignored(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = DefectDojoClient(cfg, dojo_token)
+
+    first = {"results": [{"id": 1}, {"id": 2}], "next": f"{dojo_base_url}/api/v2/findings/?offset=2"}
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        match=[responses.matchers.query_param_matcher({"o": "id", "limit": "2"})],
+        json=first, status=200
+    )
+    # Server does not know id__gt and returns the first page again
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        match=[responses.matchers.query_param_matcher({"o": "id", "limit": "2", "id__gt": "2"})],
+        json=first, status=200
+    )
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        match=[responses.matchers.query_param_matcher({"o": "id", "limit": "2", "offset": "2"})],
+        json={"results": [{"id": 3}, {"id": 4}], "next": f"{dojo_base_url}/api/v2/findings/?limit=2&o=id&offset=4"},
+        status=200
+    )
+    # From here on the server's next link is followed as-is
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        match=[responses.matchers.query_param_matcher({"o": "id", "limit": "2", "offset": "4"})],
+        json={"results": [{"id": 5}], "next": None}, status=200
+    )
+
+    assert [f["id"] for f in client.iter_findings(limit=2)] == [1, 2, 3, 4, 5]
+
+
 @responses.activate
 def test_enrich_only_missing_false_overwrites_meta(dojo_base_url, dojo_token):
     cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
@@ -52,3 +106,27 @@ def test_enrich_only_missing_false_overwrites_meta(dojo_base_url, dojo_token):
 
     updated = client.enrich_existing(product_name=None, only_missing=False, max_workers=2)
     assert updated == 1
+
+
+@responses.activate
+def test_get_findings_for_test_fetches_remaining_pages_by_count(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = DefectDojoClient(cfg, dojo_token)
+
+    # Server caps the page at 100 even though 200 were requested
+    def page(start, stop, has_next):
+        return {"count": 250, "results": [{"id": i} for i in range(start, stop)],
+                "next": f"{dojo_base_url}/api/v2/findings/?offset={stop}" if has_next else None}
+
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/findings/",
+                  match=[responses.matchers.query_param_matcher({"test": "7", "o": "id", "limit": "200"})],
+                  json=page(0, 100, True), status=200)
+    for off, stop, more in ((100, 200, True), (200, 250, False)):
+        responses.add(responses.GET, f"{dojo_base_url}/api/v2/findings/",
+                      match=[responses.matchers.query_param_matcher(
+                          {"test": "7", "o": "id", "limit": "200", "offset": str(off)})],
+                      json=page(off, stop, more), status=200)
+
+    findings = client.get_findings_for_test(7)
+    assert [f["id"] for f in findings] == list(range(250))
+    assert len(responses.calls) == 3
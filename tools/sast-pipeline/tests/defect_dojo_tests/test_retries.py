@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pytest
+import requests
 import responses
 
 from pipeline.defect_dojo.client import DojoConfig, DefectDojoClient
@@ -36,3 +38,67 @@ def test_retry_findings_500_then_200(dojo_base_url, dojo_token):
     items = list(client.iter_findings(limit=200))
     assert [i["id"] for i in items] == [1, 2]
     assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_post_retried_on_503_but_not_on_500(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = DefectDojoClient(cfg, dojo_token)
+
+    url = f"{dojo_base_url}/api/v2/findings/1/metadata/"
+    responses.add(responses.POST, url, status=503, json={"detail": "unavailable"})
+    responses.add(responses.POST, url, status=201, json={})
+    client.post_finding_meta_json(1, "sourcefile_link", "x")
+    assert len(responses.calls) == 2
+
+    # 500 may have been processed server-side: no blind re-send
+    responses.reset()
+    responses.add(responses.POST, url, status=500, json={"detail": "boom"})
+    responses.add(responses.POST, url, status=201, json={})
+    with pytest.raises(requests.HTTPError):
+        client.post_finding_meta_json(1, "sourcefile_link", "x")
+    assert len(responses.calls) == 1
+
+
+def test_retry_backoff_is_capped():
+    from pipeline.defect_dojo.client import RETRY_BACKOFF_MAX, _SHARED_RETRY
+
+    retry = _SHARED_RETRY.new(total=50)
+    for _ in range(20):
+        retry = retry.increment(method="GET", url="/api/v2/findings/")
+    assert 0 < retry.get_backoff_time() <= RETRY_BACKOFF_MAX
+
+
+@responses.activate
+def test_exhausted_retries_surface_http_status(monkeypatch, dojo_base_url, dojo_token):
+    import urllib3.util.retry
+
+    monkeypatch.setattr(urllib3.util.retry.time, "sleep", lambda _s: None)
+    client = DefectDojoClient(DojoConfig(url=dojo_base_url, verify_ssl=False), dojo_token)
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/engagements/7/", status=503, json={"detail": "down"})
+
+    # The caller sees the server's 503 rather than a generic RetryError
+    with pytest.raises(requests.HTTPError) as exc:
+        client.get_engagement(7)
+    assert exc.value.response.status_code == 503
+    assert len(responses.calls) == 4
+
+
+@responses.activate
+def test_import_scan_resent_after_503_with_bad_retry_after(monkeypatch, tmp_path, dojo_base_url, dojo_token):
+    import pipeline.defect_dojo.client as client_mod
+
+    sleeps = []
+    monkeypatch.setattr(client_mod.time, "sleep", sleeps.append)
+    client = DefectDojoClient(DojoConfig(url=dojo_base_url, verify_ssl=False), dojo_token)
+    url = f"{dojo_base_url}/api/v2/import-scan/"
+    assert client.session.get_adapter(url) is client_mod._STREAM_ADAPTER
+    responses.add(responses.POST, url, status=503, headers={"Retry-After": "soon"}, json={})
+    responses.add(responses.POST, url, status=201, json={"test": 5})
+
+    rpt = tmp_path / "r.sarif"
+    rpt.write_text("{}")
+    assert client.import_scan(1, "SARIF", str(rpt), "Info") == {"test": 5}
+    # Both attempts carried the whole report; the malformed header fell back to backoff
+    assert [b'name="file"' in c.request.body for c in responses.calls] == [True, True]
+    assert sleeps == [0.3]
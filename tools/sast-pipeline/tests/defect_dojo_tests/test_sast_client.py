@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import pytest
 import responses
 
 from pipeline.defect_dojo.client import DojoConfig
-from pipeline.defect_dojo.sast_client import SastPipelineDDClient
+from pipeline.defect_dojo.sast_client import LinkBuilder, SastPipelineDDClient
 
 
 class RepoParams:
@@ -38,7 +39,7 @@ def test_upload_report_trim_and_enrich_flow(tmp_path, dojo_base_url, dojo_token)
     # Findings for that test: two items
     responses.add(
         responses.GET, f"{dojo_base_url}/api/v2/findings/",
-        match=[responses.matchers.query_param_matcher({"test":"100","limit":"200","offset":"0"})],
+        match=[responses.matchers.query_param_matcher({"test":"100","o":"id","limit":"200"})],
         json={"results": [
             {"id": 501, "file_path": "/home/ci/build/src/utils/a.py", "test": {"id": 100}},
             {"id": 502, "file_path": "/home/ci/build/src/build/utils/b.py", "test": {"id": 100}},
@@ -84,7 +85,7 @@ def test_enrich_existing_pagination_and_only_missing(dojo_base_url, dojo_token):
     # Page 1 with 2 findings -> one already has meta, one not
     responses.add(
         responses.GET, f"{dojo_base_url}/api/v2/findings/",
-        match=[responses.matchers.query_string_matcher("related_fields=true&limit=200&offset=0")],
+        match=[responses.matchers.query_string_matcher("related_fields=true&o=id&limit=200")],
         json={"results": [
             {"id": 1, "file_path": "a.py", "test": {"engagement": {"id": 10, "source_code_management_uri":"https://git/repo","commit_hash":"abc"}}},
             {"id": 2, "file_path": "b.py", "test": {"engagement": {"id": 10, "source_code_management_uri":"https://git/repo","commit_hash":"abc"}}},
@@ -92,18 +93,16 @@ def test_enrich_existing_pagination_and_only_missing(dojo_base_url, dojo_token):
     )
     responses.add(
         responses.GET, f"{dojo_base_url}/api/v2/findings/",
-        match=[responses.matchers.query_string_matcher("related_fields=true&limit=200&offset=200")],
+        match=[responses.matchers.query_string_matcher("related_fields=true&o=id&limit=200&id__gt=2")],
         json={"results": [], "next": None}, status=200
     )
 
-    # has_sourcefile_link: id=1 True, id=2 False
+    # One batched metadata lookup per page: id=1 already linked, id=2 not
     responses.add(
-        responses.GET, f"{dojo_base_url}/api/v2/findings/1/metadata/",
-        json={"results":[{"name":"sourcefile_link","value":"x"}]}, status=200
-    )
-    responses.add(
-        responses.GET, f"{dojo_base_url}/api/v2/findings/2/metadata/",
-        json={"results":[]}, status=200
+        responses.GET, f"{dojo_base_url}/api/v2/metadata/",
+        match=[responses.matchers.query_param_matcher(
+            {"name": "sourcefile_link", "finding__in": "1,2", "limit": "200", "offset": "0"})],
+        json={"results":[{"finding": 1, "name":"sourcefile_link","value":"x"}], "next": None}, status=200
     )
     responses.add(
         responses.POST, f"{dojo_base_url}/api/v2/findings/2/metadata/",
@@ -115,3 +114,208 @@ def test_enrich_existing_pagination_and_only_missing(dojo_base_url, dojo_token):
 
     updated = client.enrich_existing(product_name=None, only_missing=True, max_workers=4)
     assert updated == 1
+
+
+@responses.activate
+def test_enrich_existing_uses_inline_finding_meta(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = SastPipelineDDClient(cfg, dojo_token)
+
+    eng = {"id": 10, "source_code_management_uri": "https://git/repo", "commit_hash": "abc"}
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        json={"results": [
+            {"id": 1, "file_path": "a.py", "test": {"engagement": eng},
+             "finding_meta": [{"name": "sourcefile_link", "value": "x"}]},
+            {"id": 2, "file_path": "b.py", "test": {"engagement": eng}, "finding_meta": []},
+        ], "next": None}, status=200
+    )
+    responses.add(
+        responses.POST, f"{dojo_base_url}/api/v2/findings/2/metadata/",
+        json={"name": "sourcefile_link", "value": "ok"}, status=201
+    )
+
+    updated = client.enrich_existing(product_name=None, only_missing=True, max_workers=2)
+    assert updated == 1
+    # Metadata presence came from the listing itself: no per-finding or batch metadata GETs
+    assert not [c for c in responses.calls if c.request.method == "GET" and "metadata" in c.request.url]
+
+
+@responses.activate
+def test_enrich_existing_reads_engagement_from_related_fields(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = SastPipelineDDClient(cfg, dojo_token)
+
+    # related_fields=true: "test" is the id, the expanded test + engagement are nested separately
+    eng = {"id": 10, "source_code_management_uri": "https://git/repo", "commit_hash": "abc"}
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        json={"results": [
+            {"id": 3, "file_path": "c.py", "test": 7, "related_fields": {"test": {"id": 7, "engagement": eng}}},
+        ], "next": None}, status=200
+    )
+    responses.add(
+        responses.POST, f"{dojo_base_url}/api/v2/findings/3/metadata/",
+        match=[responses.matchers.json_params_matcher({"name": "sourcefile_link", "value": "https://git/repo/blob/abc/c.py"})],
+        json={}, status=201
+    )
+
+    assert client.enrich_existing(product_name=None, only_missing=False, max_workers=1) == 1
+
+
+@responses.activate
+def test_enrich_existing_conditional_post_when_batch_lookup_fails(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = SastPipelineDDClient(cfg, dojo_token)
+
+    eng = {"id": 10, "source_code_management_uri": "https://git/repo", "commit_hash": "abc"}
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        json={"results": [
+            {"id": 1, "file_path": "a.py", "test": {"engagement": eng}},
+            {"id": 2, "file_path": "b.py", "test": {"engagement": eng}},
+        ], "next": None}, status=200
+    )
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/metadata/", json={"detail": "bad filter"}, status=400)
+    # id=1 already linked -> DefectDojo rejects the duplicate name; id=2 is created
+    responses.add(
+        responses.POST, f"{dojo_base_url}/api/v2/findings/1/metadata/",
+        json={"non_field_errors": ["The fields finding, name must make a unique set."]}, status=400
+    )
+    responses.add(responses.POST, f"{dojo_base_url}/api/v2/findings/2/metadata/", json={}, status=201)
+
+    assert client.enrich_existing(product_name=None, only_missing=True, max_workers=2) == 1
+    assert not [c for c in responses.calls if c.request.url.startswith(f"{dojo_base_url}/api/v2/findings/1/metadata/")
+                and c.request.method == "GET"]
+
+
+@responses.activate
+def test_enrich_existing_skips_unlinkable_findings_without_network(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = SastPipelineDDClient(cfg, dojo_token)
+
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        json={"results": [
+            {"id": 1, "file_path": "", "test": {"engagement": {"id": 10, "source_code_management_uri": "https://git/repo"}}},
+            {"id": 2, "file_path": "b.py", "test": {"engagement": {"id": 11, "source_code_management_uri": ""}}},
+        ], "next": None}, status=200
+    )
+
+    assert client.enrich_existing(product_name=None, only_missing=True, max_workers=2) == 0
+    # Only the listing itself: no metadata lookups, engagement fetches or posts
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_enrich_existing_cache_skips_known_findings_on_rerun(tmp_path, monkeypatch, dojo_base_url, dojo_token):
+    monkeypatch.setenv("SAST_ENRICH_CACHE", str(tmp_path / "enriched.sqlite"))
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = SastPipelineDDClient(cfg, dojo_token)
+
+    eng = {"id": 10, "source_code_management_uri": "https://git/repo", "commit_hash": "abc"}
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        json={"results": [
+            {"id": 1, "file_path": "a.py", "test": {"engagement": eng},
+             "finding_meta": [{"name": "sourcefile_link", "value": "x"}]},
+            {"id": 2, "file_path": "b.py", "test": {"engagement": eng}, "finding_meta": []},
+        ], "next": None}, status=200
+    )
+    responses.add(responses.POST, f"{dojo_base_url}/api/v2/findings/2/metadata/", json={}, status=201)
+
+    assert client.enrich_existing(product_name=None, only_missing=True, max_workers=2) == 1
+    calls_first_run = len(responses.calls)
+
+    # Second run: both findings are recorded as linked -> only the listing is fetched
+    assert client.enrich_existing(product_name=None, only_missing=True, max_workers=2) == 0
+    assert len(responses.calls) == calls_first_run + 1
+
+
+@pytest.mark.parametrize("repo_url, expected", [
+    ("https://github.com/org/repo/", "https://github.com/org/repo/blob/abc/src/a.py"),
+    ("https://gitlab.example.com/g/repo", "https://gitlab.example.com/g/repo/-/blob/abc/src/a.py"),
+    ("https://bitbucket.org/org/repo", "https://bitbucket.org/org/repo/src/abc/src/a.py"),
+    ("https://bitbucket.corp/projects/p/repos/r", "https://bitbucket.corp/projects/p/repos/r/browse/src/a.py?at=abc"),
+    ("https://dev.azure.com/o/p/_git/r", "https://dev.azure.com/o/p/_git/r/?path=/src/a.py&version=GCabc"),
+])
+def test_link_builder_template_matches_build(repo_url, expected):
+    linker = LinkBuilder()
+    link_for = linker.template_for(repo_url, "abc")
+    assert link_for("file:///src/a.py") == expected
+    assert linker.build(repo_url, "file:///src/a.py", "abc") == expected
+    assert link_for("") is None
+    assert linker.template_for("", "abc")("src/a.py") is None
+
+
+@pytest.mark.parametrize("repo_url, scm", [
+    ("https://github.com/o/r", "github"),
+    ("https://gitlab.example.com/g/r", "gitlab"),
+    ("https://bitbucket.org/o/r", "bitbucket-cloud"),
+    ("https://bitbucket.corp/projects/p", "bitbucket-server"),
+    ("https://dev.azure.com/o/p/_git/r", "azure"),
+    ("https://org.visualstudio.com/p/_git/r", "azure"),
+    ("https://git.mygitlab.corp/g/r", "gitlab"),
+    ("https://example.com/r", "generic"),
+])
+def test_scm_type_detection(repo_url, scm):
+    assert LinkBuilder._scm_type(repo_url) == scm
+
+
+@pytest.mark.parametrize("mode,expected", [
+    ("analyzer", "semgrep"),
+    ("analyzer-branch", "semgrep-main"),
+    ("analyzer-sha", "semgrep-0123abcd"),
+    ("analyzer-branch-sha", "semgrep-main-0123abcd"),
+    ("bogus", "semgrep-0123abcd"),
+])
+def test_derive_engagement_name_modes(mode, expected):
+    assert SastPipelineDDClient.derive_engagement_name("semgrep", "main", "0123abcdef", mode) == expected
+    assert SastPipelineDDClient.derive_engagement_name("semgrep", None, None, mode) == "semgrep"
+
+
+@responses.activate
+def test_enrich_existing_stops_on_auth_failure(dojo_base_url, dojo_token):
+    import re
+
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = SastPipelineDDClient(cfg, dojo_token)
+
+    eng = {"id": 10, "source_code_management_uri": "https://git/repo", "commit_hash": "abc"}
+    responses.add(
+        responses.GET, f"{dojo_base_url}/api/v2/findings/",
+        json={"results": [{"id": i, "file_path": f"f{i}.py", "test": {"engagement": eng}, "finding_meta": []}
+                          for i in range(1, 6)], "next": None}, status=200
+    )
+    responses.add(responses.POST, re.compile(rf"{re.escape(dojo_base_url)}/api/v2/findings/\d+/metadata/"),
+                  json={"detail": "Invalid token."}, status=401)
+
+    assert client.enrich_existing(product_name=None, only_missing=True, max_workers=1) == 0
+    # The first 401 stops the run instead of repeating it for every finding
+    assert len([c for c in responses.calls if c.request.method == "POST"]) == 1
+
+
+@responses.activate
+def test_enrich_existing_refresh_patches_existing_link(dojo_base_url, dojo_token):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = SastPipelineDDClient(cfg, dojo_token)
+
+    eng = {"id": 10, "source_code_management_uri": "https://git/repo", "commit_hash": "abc"}
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/findings/",
+                  json={"results": [{"id": 1, "file_path": "a.py", "test": {"engagement": eng}},
+                                    {"id": 2, "file_path": "b.py", "test": {"engagement": eng}}],
+                        "next": None}, status=200)
+    responses.add(responses.POST, f"{dojo_base_url}/api/v2/findings/1/metadata/",
+                  json={"non_field_errors": ["Metadata with this name already exists."]}, status=400)
+    responses.add(responses.POST, f"{dojo_base_url}/api/v2/findings/2/metadata/", json={}, status=201)
+    responses.add(responses.GET, f"{dojo_base_url}/api/v2/metadata/",
+                  match=[responses.matchers.query_param_matcher({"finding": "1", "name": "sourcefile_link"})],
+                  json={"results": [{"id": 77, "finding": 1, "name": "sourcefile_link", "value": "old"}]},
+                  status=200)
+    responses.add(responses.PATCH, f"{dojo_base_url}/api/v2/metadata/77/",
+                  match=[responses.matchers.json_params_matcher({"value": "https://git/repo/blob/abc/a.py"})],
+                  json={}, status=200)
+
+    assert client.enrich_existing(product_name=None, only_missing=False, max_workers=2) == 2
+    # New links are a single POST; only the duplicate needs the lookup + PATCH
+    assert [c.request.method for c in responses.calls].count("GET") == 2
@@ -36,3 +36,17 @@ def test_delete_handles_http_error_gracefully(dojo_base_url, dojo_token):
                   status=500, json={"detail":"boom"})
     with pytest.raises(requests.HTTPError):
         client.delete_finding(999)
+
+
+@responses.activate
+def test_delete_findings_counts_successes_and_continues(dojo_base_url, dojo_token, caplog):
+    cfg = DojoConfig(url=dojo_base_url, verify_ssl=False)
+    client = DefectDojoClient(cfg, dojo_token)
+
+    responses.add(responses.DELETE, f"{dojo_base_url}/api/v2/findings/1/", status=204)
+    responses.add(responses.DELETE, f"{dojo_base_url}/api/v2/findings/2/", status=500, json={"detail": "boom"})
+    responses.add(responses.DELETE, f"{dojo_base_url}/api/v2/findings/3/", body=ValueError("odd reply"))
+    responses.add(responses.DELETE, f"{dojo_base_url}/api/v2/findings/4/", status=204)
+
+    assert client.delete_findings([1, 2, 3, 4], file_paths={2: "src/b.py"}) == 2
+    assert any("id=2 file_path=src/b.py" in r.getMessage() for r in caplog.records)
@@ -18,6 +18,11 @@ class DummyClient:
     def delete_finding(self, fid: int) -> None:
         self.deleted.append(fid)
 
+    def delete_findings(self, fids, file_paths=None) -> int:
+        for fid in fids:
+            self.delete_finding(fid)
+        return len(fids)
+
 
 def test_delete_findings_by_product_and_path_prefix_monkeypatch(monkeypatch, tmp_path):
     # Patch utils to use our DummyClient instead of real SastPipelineDDClient
@@ -32,3 +37,56 @@ def test_delete_findings_by_product_and_path_prefix_monkeypatch(monkeypatch, tmp
         dry_run=False,
     )
     assert matched == 2 and deleted == 2
+
+
+class DummyCfgHelper:
+    def __init__(self, *_):
+        pass
+
+    def get_analyzers(self):
+        return [{"name": n, "type": "sarif"} for n in ("a1", "a2", "a3")]
+
+    def get_analyzer_result_file_name(self, analyzer):
+        return f"{analyzer['name']}.sarif"
+
+
+def test_upload_results_keeps_analyzer_order(monkeypatch, tmp_path):
+    import time
+
+    for n in ("a1", "a2", "a3"):
+        (tmp_path / f"{n}.sarif").write_text("{}")
+
+    executors = set()
+
+    class UploadClient:
+        def get_or_create_product(self, name):
+            return {"id": 1, "name": name}
+
+        def upload_report(self, analyzer_name, executor=None, **_):
+            executors.add(executor)
+            # First analyzer finishes last
+            time.sleep({"a1": 0.05, "a2": 0.0, "a3": 0.01}[analyzer_name])
+            return analyzer_name
+
+    client = UploadClient()
+    monkeypatch.setenv("DEFECTDOJO_TOKEN", "x")
+    monkeypatch.setattr(dd_utils, "load_dojo_config", lambda *_: object())
+    monkeypatch.setattr(dd_utils, "read_repo_params", lambda *_: None)
+    monkeypatch.setattr(dd_utils, "AnalyzersConfigHelper", DummyCfgHelper)
+    monkeypatch.setattr(dd_utils, "SastPipelineDDClient", lambda *_: client)
+
+    results = dd_utils.upload_results(str(tmp_path), None, "Prod", "cfg.yaml", str(tmp_path), "")
+    assert results == ["a1", "a2", "a3"]
+    # All reports enrich on one shared pool
+    assert len(executors) == 1 and None not in executors
+
+
+@pytest.mark.parametrize("output_type,scan_type", [
+    ("SARIF", "SARIF"),
+    ("sarif", "SARIF"),
+    ("XML", "Generic XML Import"),
+    ("generic-xml", "Generic XML Import"),
+    ("Semgrep JSON Report", "Semgrep JSON Report"),
+])
+def test_resolve_scan_type_aliases(output_type, scan_type):
+    assert dd_utils.resolve_scan_type({"output_type": output_type}) == scan_type
@@ -4,4 +4,12 @@ import pytest
 
 PROJECT_ROOT = os.getenv("PROJECT_ROOT") or os.getcwd()
 if PROJECT_ROOT not in sys.path:
-    sys.path.insert(0, PROJECT_ROOT)
\ No newline at end of file
+    sys.path.insert(0, PROJECT_ROOT)
+
+@pytest.fixture(autouse=True)
+def _clear_image_cache():
+    # image_exists remembers images per process; keep tests independent of each other
+    from pipeline import docker_utils
+    docker_utils._reset_image_cache()
+    yield
+    docker_utils._reset_image_cache()
@@ -71,6 +71,61 @@ def test_build_image_if_needed_builds_with_and_without_log_level(monkeypatch):
     assert captured[-1]["build_args"] == {"LOG_LEVEL": "TRACE"}
 
 
+def test_build_image_if_needed_builds_shared_image_once(monkeypatch):
+    """Concurrent callers for the same image wait for one build."""
+    import threading
+    import time
+
+    built = []
+    present = set()
+
+    def fake_build_image(*, image_name, **kwargs):
+        time.sleep(0.05)
+        built.append(image_name)
+        present.add(image_name)
+
+    monkeypatch.setattr(ar.docker_utils, "image_exists", lambda name: name in present)
+    monkeypatch.setattr(ar.docker_utils, "build_image", fake_build_image)
+    threads = [threading.Thread(target=ar.build_image_if_needed, args=("shared", "/ctx")) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert built == ["shared"]
+
+
+def test_build_all_images_builds_each_image_once(monkeypatch):
+    """Analyzers sharing an image trigger one build; the first analyzer's
+    Dockerfile directory is used."""
+    calls = []
+    monkeypatch.setattr(ar, "build_image_if_needed", lambda image, ctx: calls.append((image, ctx)))
+    ar.build_all_images([
+        {"name": "a", "image": "img1"},
+        {"name": "b", "image": "img1", "dockerfile_path": "/other"},
+        {"name": "c", "image": "img2", "dockerfile_path": "/ctx/c"},
+    ])
+    assert sorted(calls) == [("img1", "/app/Dockerfiles/a"), ("img2", "/ctx/c")]
+
+
+def test_build_all_images_raises_build_failure(monkeypatch):
+    def fake_build(image, ctx):
+        if image == "bad":
+            raise RuntimeError("build failed")
+
+    monkeypatch.setattr(ar, "build_image_if_needed", fake_build)
+    with pytest.raises(RuntimeError, match="build failed"):
+        ar.build_all_images([{"name": "a", "image": "good"}, {"name": "b", "image": "bad"}])
+
+
+@pytest.mark.parametrize("value, expected", [(None, 4), ("1", 1), ("8", 8), ("0", 1), ("many", 4)])
+def test_analyzer_workers(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("SAST_PARALLEL", raising=False)
+    else:
+        monkeypatch.setenv("SAST_PARALLEL", value)
+    assert ar.analyzer_workers() == expected
+
+
 def test_run_docker_with_builder_container(monkeypatch):
     """Verify that ``run_docker`` invokes the Docker run helper with
     volumes inherited from a builder container and passes through
@@ -347,6 +402,34 @@ def test_run_selected_analyzers_skip_builder_on_non_compile_project(monkeypatch,
     assert run_calls == ["img2"]
 
 
+def test_run_selected_analyzers_shared_image_gets_distinct_containers(monkeypatch, tmp_path):
+    """Analyzers running in parallel on one image must not collide on
+    ``docker run --name``."""
+    config = {
+        "analyzers": [
+            {"name": "one", "image": "shared", "enabled": True, "time_class": "fast", "type": "default"},
+            {"name": "two", "image": "shared", "enabled": True, "time_class": "fast", "type": "default"},
+        ]
+    }
+    cfg_path = tmp_path / "analyzers.yaml"
+    with cfg_path.open("w", encoding="utf-8") as fh:
+        yaml.dump(config, fh)
+    names = []
+    monkeypatch.setattr(ar, "build_image_if_needed", lambda image_name, dockerfile_dir: None)
+    monkeypatch.setattr(ar.docker_utils, "run_container", lambda **kwargs: names.append(kwargs["name"]))
+    monkeypatch.setenv("SAST_PARALLEL", "2")
+    out_dir = tmp_path / "out"
+    ar.run_selected_analyzers(
+        config_path=str(cfg_path),
+        pipeline_id="pid",
+        project_path=str(tmp_path / "proj"),
+        output_dir=str(out_dir),
+        builder_container="builder",
+        max_time_class="slow",
+    )
+    assert sorted(names) == ["sast_shared_one_pid", "sast_shared_two_pid"]
+
+
 def test_run_selected_analyzers_no_analyzers(monkeypatch, tmp_path):
     """If there are no enabled analyzers after filtering, the function
     should warn and return ``None`` without invoking docker helpers."""
@@ -314,4 +314,28 @@ def test_pretty_print_table_and_stats(capsys, tmp_path):
     assert "a" in table and "b" in table and "c" in table
     # Stats should include totals and per‑language metrics
     assert "Total analyzers" in table
-    assert "py" in table and "js" in table
\ No newline at end of file
+    assert "py" in table and "js" in table
+
+def test_config_parse_cached_until_file_changes(tmp_path, monkeypatch):
+    """Helpers built from an unchanged file share one YAML parse; a newer
+    mtime forces a re-read, and each helper owns its copy of the data."""
+    import pipeline.config_utils as cu
+
+    cfg = tmp_path / "analyzers.yaml"
+    cfg.write_text(yaml.safe_dump({"analyzers": [{"name": "a", "language": "py", "image": "img"}]}))
+    calls = []
+    real_load = yaml.load
+    monkeypatch.setattr(cu.yaml, "load", lambda *a, **k: calls.append(1) or real_load(*a, **k))
+    cu._read_yaml.cache_clear()
+
+    first = AH(str(cfg))
+    second = AH(str(cfg))
+    assert len(calls) == 1
+    first.config["analyzers"].append({"name": "mutated"})
+    assert AH.get_names(second.config["analyzers"]) == ["a"]
+
+    cfg.write_text(yaml.safe_dump({"analyzers": [{"name": "b", "language": "py", "image": "img"}]}))
+    st = os.stat(cfg)
+    os.utime(cfg, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert AH.get_names(AH(str(cfg)).get_analyzers()) == ["b"]
+    assert len(calls) == 2
@@ -50,31 +50,114 @@ def test_construct_container_name(monkeypatch):
 
 
 def test_image_exists(monkeypatch):
-    """The helper should return True if ``docker images -q`` produces any
-    output and False otherwise."""
+    """The helper should return True if ``docker image inspect`` succeeds
+    and False otherwise."""
     import subprocess
     import pipeline.docker_utils as du
 
     class DummyResult:
-        def __init__(self, stdout):
+        def __init__(self, returncode, stdout=""):
+            self.returncode = returncode
             self.stdout = stdout
 
     # Simulate a found image
     monkeypatch.setattr(
         subprocess,
         "run",
-        lambda *args, **kwargs: DummyResult("abc\n"),
+        lambda *args, **kwargs: DummyResult(0),
     )
     assert du.image_exists("some-image") is True
     # Simulate no image found
     monkeypatch.setattr(
         subprocess,
         "run",
-        lambda *args, **kwargs: DummyResult("\n"),
+        lambda *args, **kwargs: DummyResult(1),
     )
     assert du.image_exists("other-image") is False
 
 
+def test_image_exists_remembers_present_images(monkeypatch):
+    """One ``docker images`` listing answers for every image it contains; a
+    found image is not looked up again until this process removes it, and
+    missing images are always re-checked."""
+    import subprocess
+    import pipeline.docker_utils as du
+
+    calls = []
+
+    class DummyResult:
+        def __init__(self, returncode, stdout=""):
+            self.returncode = returncode
+            self.stdout = stdout
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        if cmd[:2] == ["docker", "images"]:
+            return DummyResult(0, "indexed:latest\nother:1.0\n<none>:<none>\n")
+        return DummyResult(0 if cmd[-1] == "present" else 1)
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    monkeypatch.setattr(du, "run_logged_cmd", lambda cmd, log_addition="": None)
+    assert du.image_exists("indexed") and du.image_exists("indexed:latest") and du.image_exists("other:1.0")
+    assert len(calls) == 1
+    assert du.image_exists("present") and du.image_exists("present")
+    assert not du.image_exists("missing") and not du.image_exists("missing")
+    assert len(calls) == 4
+
+    du.delete_image_if_exist("present")
+    du.image_exists("present")
+    assert len(calls) == 5
+
+    # Either spelling of an indexed :latest image is forgotten on delete
+    du.delete_image_if_exist("indexed")
+    assert not du.image_exists("indexed:latest")
+    du.delete_image_if_exist("other:1.0")
+    assert not du.image_exists("other:1.0")
+    assert len(calls) == 7
+
+
+def test_run_logged_cmd_drains_both_streams(caplog):
+    """Large stderr output must not stall stdout, and lines written in
+    several pieces are logged whole."""
+    import logging
+    import sys
+    import pipeline.docker_utils as du
+
+    script = (
+        "import sys\n"
+        "sys.stderr.write('[ERROR] e' * 20000 + '\\n'); sys.stderr.flush()\n"
+        "sys.stdout.write('[INFO] par'); sys.stdout.flush()\n"
+        "sys.stdout.write('tial\\nlast')\n"
+    )
+    with caplog.at_level(logging.INFO, logger=du.log.name):
+        du.run_logged_cmd([sys.executable, "-c", script], log_addition="[t] ")
+    messages = [r.getMessage() for r in caplog.records]
+    assert "[t] partial" in messages
+    assert "[t] last" in messages
+    # The 200 KB stderr line arrives in many reads but is logged once
+    assert [r.levelname for r in caplog.records if r.getMessage() == "[t] e"] == ["ERROR"]
+
+
+@pytest.mark.parametrize("line,stream,level,message", [
+    ("[warn] disk low\n", "stdout", "WARNING", "disk low"),
+    ("x [INFO] y [Err] boom", "stdout", "ERROR", "boom"),
+    ("[crit] down", "stdout", "CRITICAL", "down"),
+    ("[ERROR] at list[0] [tmp", "stdout", "ERROR", "at list[0] [tmp"),
+    ("[DEBUG] noisy [not-a-level]", "stdout", "DEBUG", "noisy [not-a-level]"),
+    ("array[1] = [x]", "stderr", "WARNING", "array[1] = [x]"),
+    ("plain", "stderr", "WARNING", "plain"),
+    ("plain", "stdout", "INFO", "plain"),
+])
+def test_log_container_line_levels(caplog, line, stream, level, message):
+    """The last [LEVEL] token decides the level; untagged lines fall back by stream."""
+    import logging
+    import pipeline.docker_utils as du
+
+    with caplog.at_level(logging.DEBUG, logger=du.log.name):
+        du._log_container_line(line, stream=stream)
+    assert [(r.levelname, r.getMessage()) for r in caplog.records] == [(level, message)]
+
+
 def test_delete_image_if_exist(monkeypatch):
     """``delete_image_if_exist`` should call the removal command only
     when the image actually exists."""
@@ -171,25 +254,109 @@ def test_build_image_logging_and_exit(monkeypatch, caplog):
     # With check=False a non‑zero returncode should not raise
     monkeypatch.setattr(subprocess, "Popen", lambda *args, **kwargs: DummyPopen(["failed step"], returncode=1))
     du.build_image(image_name="nocheck", context_dir=".", check=False)
+    # Only successful builds are remembered for image_exists
+    assert "testimg" in du._PRESENT_IMAGES
+    assert not {"errimg", "nocheck"} & du._PRESENT_IMAGES
+
+
+def test_build_image_log_levels(monkeypatch, caplog):
+    """Build lines go to default_log_level unless they look like errors;
+    lines below the logger's level are dropped."""
+    import logging
+    import subprocess
+    import pipeline.docker_utils as du
+
+    class DummyPopen:
+        def __init__(self, *args, **kwargs):
+            self.stdout = iter([
+                "Step 1/2 : RUN make\n",
+                "Setting up libgpg-error0:amd64 (1.46-1) ...\n",
+                "make: *** build failed (exit 2)\n",
+                "#8 ERROR: process did not complete successfully\n",
+            ])
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def wait(self):
+            return 0
+
+    monkeypatch.setattr(subprocess, "Popen", DummyPopen)
+    with caplog.at_level(logging.WARNING, logger=du.log.name):
+        du.build_image(image_name="img", context_dir=".", default_log_level="DEBUG")
+    assert [(r.levelname, r.getMessage()) for r in caplog.records] == [
+        ("ERROR", "[build img] make: *** build failed (exit 2)"),
+        ("ERROR", "[build img] #8 ERROR: process did not complete successfully"),
+    ]
+    caplog.clear()
+    with caplog.at_level(logging.DEBUG, logger=du.log.name):
+        du.build_image(image_name="img", context_dir=".", default_log_level="INFO")
+    assert [r.levelname for r in caplog.records] == ["INFO", "INFO", "ERROR", "ERROR"]
+
+
+def test_build_image_uses_buildkit_unless_disabled(monkeypatch):
+    import subprocess
+    import pipeline.docker_utils as du
+
+    seen = []
+
+    class DummyPopen:
+        def __init__(self, cmd, **kwargs):
+            seen.append((cmd, kwargs["env"]))
+            self.stdout = iter([])
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def wait(self):
+            return 0
+
+    monkeypatch.setattr(subprocess, "Popen", DummyPopen)
+    monkeypatch.delenv("DOCKER_BUILDKIT", raising=False)
+    du.build_image(image_name="img", context_dir=".")
+    cmd, env = seen[-1]
+    assert env["DOCKER_BUILDKIT"] == "1"
+    assert cmd == ["docker", "build", "-t", "img", "--progress=plain", "."]
+    assert "DOCKER_BUILDKIT" not in os.environ
+
+    for off in ("0", "false", "No"):
+        monkeypatch.setenv("DOCKER_BUILDKIT", off)
+        du.build_image(image_name="img", context_dir=".")
+        cmd, env = seen[-1]
+        assert env["DOCKER_BUILDKIT"] == "0"
+        assert "--progress=plain" not in cmd
 
 
 def test_cleanup_pipeline_containers(monkeypatch):
-    """Cleaning up pipeline containers should call ``docker rm -f`` for
-    every matching container returned by ``docker ps``."""
+    """Cleaning up pipeline containers should remove every matching
+    container returned by ``docker ps`` with a single ``docker rm -f``,
+    retrying one by one only the containers it did not remove."""
     import subprocess
     import pipeline.docker_utils as du
+    run_calls = []
     calls = []
+    rm_result = {"stdout": "cont1\ncont2\n", "returncode": 0}
     # Simulate docker ps returning two container names
     class DummyCompleted:
-        def __init__(self, stdout):
+        def __init__(self, stdout, returncode=0):
             self.stdout = stdout
-    monkeypatch.setattr(
-        subprocess,
-        "run",
-        lambda *args, **kwargs: DummyCompleted("cont1\ncont2\n"),
-    )
+            self.returncode = returncode
+
+    def fake_run(cmd, **kwargs):
+        run_calls.append(cmd)
+        if cmd[1] == "ps":
+            return DummyCompleted("cont1\ncont2\n")
+        return DummyCompleted(**rm_result)
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
     # Capture calls to run_logged_cmd instead of actually removing containers
     monkeypatch.setattr(du, "run_logged_cmd", lambda cmd, log_addition="": calls.append(cmd))
     du.cleanup_pipeline_containers("pid")
-    # Should call docker rm -f on both containers
-    assert calls == [["docker", "rm", "-f", "cont1"], ["docker", "rm", "-f", "cont2"]]
\ No newline at end of file
+    # Should call docker rm -f once for both containers
+    assert run_calls[-1] == ["docker", "rm", "-f", "cont1", "cont2"]
+    assert calls == []
+
+    # cont2 was not removed by the batch call and is retried on its own
+    rm_result.update(stdout="cont1\n", returncode=1)
+    du.cleanup_pipeline_containers("pid")
+    assert calls == [["docker", "rm", "-f", "cont2"]]